@@ -0,0 +1,157 @@
+"""
+音频采集服务
+每个监听会话只打开一次麦克风：后台线程持续从 PortAudio 流读取音频帧放入缓冲队列，
+分段器（Recognizer.listen）从缓冲中取帧。这样不必每句话都重新创建 PyAudio 实例、
+重新打开设备，句与句之间的音频也不会丢失。
+SpeechRecognizer 和 BaiduSpeechSimple 共用此服务。
+音频源可以是任何 audio_sources.AudioSource：非实时音频源（文件、合成音频）缓冲满时等待而不丢帧，
+音频源读完（返回空字节串）后采集自动结束。
+传入取消令牌时，取消即关闭采集并释放设备，正在等待音频帧的分段器立即得到 Cancelled。
+"""
+import collections
+import threading
+
+import speech_recognition as sr
+
+from cancellation import Cancelled
+
+
+class _BufferedStream:
+    """从采集缓冲读取音频帧的流对象，接口与 sr.Microphone 的 stream 一致"""
+
+    def __init__(self, service):
+        self._service = service
+
+    def read(self, size):
+        # 采集线程按 CHUNK 读取，分段器也按 CHUNK 读取，因此每次返回一帧即可
+        return self._service.read_frame()
+
+    def close(self):
+        pass
+
+
+class CapturedAudioSource(sr.AudioSource):
+    """由采集服务提供数据的音频源，可直接传给 Recognizer.listen"""
+
+    def __init__(self, service, microphone):
+        self.SAMPLE_RATE = microphone.SAMPLE_RATE
+        self.SAMPLE_WIDTH = microphone.SAMPLE_WIDTH
+        self.CHUNK = microphone.CHUNK
+        self.stream = _BufferedStream(service)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class AudioCaptureService:
+    """长期运行的音频采集服务"""
+
+    def __init__(self, microphone, max_buffer_seconds=60, cancel_token=None):
+        """
+        microphone: sr.Microphone 或 audio_sources.AudioSource 实例
+        max_buffer_seconds: 缓冲的最大时长，消费者停滞时丢弃最旧的帧（非实时音频源则等待）
+        cancel_token: cancellation.CancellationToken，取消时关闭采集
+        """
+        self.microphone = microphone
+        frames_per_second = microphone.SAMPLE_RATE / float(microphone.CHUNK)
+        self._frames = collections.deque(maxlen=max(1, int(max_buffer_seconds * frames_per_second)))
+        self._cond = threading.Condition()
+        self._close_lock = threading.Lock()
+        self._cancel_token = cancel_token
+        self._device_source = None
+        self._reader = None
+        self._running = False
+        self.error = None
+        self.source = None
+
+    @property
+    def is_open(self):
+        return self._running
+
+    def open(self):
+        """打开设备并启动采集线程，返回可供 listen 使用的音频源"""
+        if self._running:
+            return self.source
+        self._device_source = self.microphone.__enter__()
+        self.error = None
+        self._frames.clear()
+        self._running = True
+        self.source = CapturedAudioSource(self, self.microphone)
+        self._reader = threading.Thread(target=self._read_loop)
+        self._reader.daemon = True
+        self._reader.start()
+        if self._cancel_token is not None:
+            self._cancel_token.register(self.close)
+        return self.source
+
+    def close(self):
+        """停止采集并释放设备（可在任意线程调用，重复调用无副作用）"""
+        with self._close_lock:
+            with self._cond:
+                was_running = self._running
+                self._running = False
+                self._cond.notify_all()
+            # 采集线程最多再读完当前这一帧
+            if self._reader and self._reader is not threading.current_thread():
+                self._reader.join(timeout=1)
+            self._reader = None
+            if self._device_source is not None or was_running:
+                try:
+                    self.microphone.__exit__(None, None, None)
+                except Exception:
+                    pass
+                self._device_source = None
+        if self._cancel_token is not None:
+            self._cancel_token.unregister(self.close)
+
+    def read_frame(self):
+        """取出下一帧音频；采集已停止且缓冲为空时返回空字节串，已取消时抛出 Cancelled"""
+        with self._cond:
+            while True:
+                if self._cancel_token is not None and self._cancel_token.is_cancelled:
+                    raise Cancelled()
+                if self._frames:
+                    break
+                if self.error is not None:
+                    raise IOError(f"音频设备读取失败: {self.error}")
+                if not self._running:
+                    return b""
+                self._cond.wait(0.1)
+            frame = self._frames.popleft()
+            self._cond.notify_all()
+            return frame
+
+    def _read_loop(self):
+        """采集线程：持续读取设备数据"""
+        stream = self._device_source.stream
+        chunk = self.microphone.CHUNK
+        realtime = getattr(self.microphone, "realtime", True)
+        while self._running:
+            try:
+                data = stream.read(chunk)
+            except Exception as e:
+                with self._cond:
+                    self.error = e
+                    self._running = False
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                if not data:
+                    # 有限长度的音频源已读完
+                    self._running = False
+                    self._cond.notify_all()
+                    return
+                if not realtime:
+                    while self._running and len(self._frames) >= self._frames.maxlen:
+                        self._cond.wait(0.1)
+                self._frames.append(data)
+                self._cond.notify_all()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
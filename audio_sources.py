@@ -0,0 +1,319 @@
+"""
+音频源
+识别流程原来只能使用 sr.Microphone。这里定义统一的 AudioSource 接口（sr.AudioSource 的子类，
+可直接用于 adjust_for_ambient_noise 和 AudioCaptureService），并提供三种实现：
+- DeviceAudioSource: 麦克风设备（即 sr.Microphone）
+- FileAudioSource: 按块流式读取 WAV / FLAC 文件，不整体载入内存
+- SyntheticAudioSource: 按脚本生成"说话 / 停顿"的合成音频
+
+所有音频源都输出 16bit 单声道 PCM，流读到末尾时 read() 返回空字节串。
+realtime 为 False 的音频源读取速度不受实时限制，可以快于实时地回放录音，
+采集服务对这类音频源不会丢帧（缓冲满时等待消费者）。
+"""
+import math
+import os
+import random
+import struct
+import subprocess
+import threading
+import time
+import wave
+
+import speech_recognition as sr
+
+OUTPUT_WIDTH = 2
+_UNSIGNED_TO_SIGNED = bytes((b ^ 0x80) for b in range(256))
+
+# Pa_Initialize / Pa_Terminate 不是线程安全的（引用计数没有加锁），所有 PyAudio() 和 terminate() 都经过这把锁；
+# 打开、读取和关闭流不需要加锁，各设备可以并发进行
+_portaudio_lock = threading.Lock()
+
+
+def init_portaudio(pyaudio_module):
+    """创建 PyAudio 实例（初始化 PortAudio）"""
+    with _portaudio_lock:
+        return pyaudio_module.PyAudio()
+
+
+def terminate_portaudio(audio):
+    """释放 init_portaudio 创建的 PyAudio 实例"""
+    with _portaudio_lock:
+        audio.terminate()
+
+
+class AudioSource(sr.AudioSource):
+    """音频源接口：SAMPLE_RATE / SAMPLE_WIDTH / CHUNK，进入上下文后 stream.read(n) 返回 n 帧"""
+
+    realtime = True   # read() 是否按实时速度返回数据
+    name = None       # 用于显示和噪声校准缓存的名称
+
+    def __enter__(self):
+        raise NotImplementedError
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        raise NotImplementedError
+
+
+class DeviceAudioSource(sr.Microphone, AudioSource):
+    """麦克风设备；PortAudio 的初始化和释放经过 init_portaudio / terminate_portaudio，可在多个线程中同时使用"""
+
+    realtime = True
+
+    def __init__(self, *args, **kwargs):
+        # sr.Microphone 的构造函数会初始化并释放一次 PortAudio 来查询设备信息
+        with _portaudio_lock:
+            super().__init__(*args, **kwargs)
+
+    def __enter__(self):
+        assert self.stream is None, "This audio source is already inside a context manager"
+        self.audio = init_portaudio(self.pyaudio_module)
+        try:
+            self.stream = sr.Microphone.MicrophoneStream(
+                self.audio.open(
+                    input_device_index=self.device_index, channels=1, format=self.format,
+                    rate=self.SAMPLE_RATE, frames_per_buffer=self.CHUNK, input=True,
+                )
+            )
+        except Exception:
+            # sr.Microphone 在这里吞掉了异常，之后读取时才报错；这里直接抛出
+            terminate_portaudio(self.audio)
+            self.audio = None
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.stream.close()
+        finally:
+            self.stream = None
+            terminate_portaudio(self.audio)
+            self.audio = None
+
+
+class _Pacer:
+    """按实时速度节流（realtime 音频源使用）"""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self._next = None
+
+    def wait(self, frames):
+        now = time.monotonic()
+        if self._next is None:
+            self._next = now
+        self._next += frames / float(self.sample_rate)
+        if self._next > now:
+            time.sleep(self._next - now)
+
+
+def _to_mono16(data, width, channels, signed_8bit=False):
+    """
+    取第一个声道并转换为 16bit 有符号 PCM（切片操作，不逐个采样处理）
+    signed_8bit: 8bit 数据是否有符号（WAV 的 8bit 是无符号的，flac 程序按 --sign=signed 解码）
+    """
+    frame_size = width * channels
+    data = bytes(data[:len(data) - len(data) % frame_size])
+    if channels > 1:
+        mono = bytearray(len(data) // channels)
+        for k in range(width):
+            mono[k::width] = data[k::frame_size]
+        data = bytes(mono)
+    if width == 2:
+        return data
+    out = bytearray(len(data) // width * OUTPUT_WIDTH)
+    if width == 1:
+        out[1::2] = data if signed_8bit else data.translate(_UNSIGNED_TO_SIGNED)
+    else:
+        # 24 / 32bit 保留最高的两个字节
+        out[0::2] = data[width - 2::width]
+        out[1::2] = data[width - 1::width]
+    return bytes(out)
+
+
+class _WavStream:
+    def __init__(self, source):
+        self._source = source
+        self._wave = wave.open(source.path, "rb")
+        self._pacer = _Pacer(source.SAMPLE_RATE) if source.realtime else None
+
+    def read(self, size):
+        data = self._wave.readframes(size)
+        if not data and self._source.loop:
+            self._wave.rewind()
+            data = self._wave.readframes(size)
+        if self._pacer and data:
+            self._pacer.wait(size)
+        return _to_mono16(data, self._source._width, self._source._channels)
+
+    def close(self):
+        self._wave.close()
+
+
+class _FlacStream:
+    """通过 flac 程序解码为原始 PCM 并从管道按块读取"""
+
+    def __init__(self, source):
+        self._source = source
+        self._pacer = _Pacer(source.SAMPLE_RATE) if source.realtime else None
+        self._process = None
+        self._start()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            [sr.get_flac_converter(), "--decode", "--stdout", "--silent", "--force-raw-format",
+             "--endian=little", "--sign=signed", self._source.path],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def read(self, size):
+        frame_size = self._source._width * self._source._channels
+        data = self._process.stdout.read(size * frame_size)
+        if not data and self._source.loop:
+            self.close()
+            self._start()
+            data = self._process.stdout.read(size * frame_size)
+        if self._pacer and data:
+            self._pacer.wait(size)
+        return _to_mono16(data, self._source._width, self._source._channels, signed_8bit=True)
+
+    def close(self):
+        if self._process:
+            self._process.stdout.close()
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+
+def _flac_stream_info(path):
+    """读取 FLAC 的 STREAMINFO，返回 (采样率, 声道数, 采样位数)"""
+    with open(path, "rb") as f:
+        header = f.read(42)
+    if len(header) < 42 or header[:4] != b"fLaC" or header[4] & 0x7F != 0:
+        raise ValueError(f"不是有效的 FLAC 文件: {path}")
+    packed = int.from_bytes(header[18:26], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    return sample_rate, channels, bits
+
+
+class FileAudioSource(AudioSource):
+    """
+    WAV / FLAC 文件音频源，按块流式读取
+    realtime: 为 True 时按实时速度返回数据（模拟麦克风），默认尽快读取
+    loop: 读到末尾后从头开始
+    """
+
+    def __init__(self, path, chunk_size=1024, realtime=False, loop=False):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.CHUNK = chunk_size
+        self.SAMPLE_WIDTH = OUTPUT_WIDTH
+        self.stream = None
+
+        with open(path, "rb") as f:
+            magic = f.read(4)
+        if magic == b"fLaC":
+            self._stream_class = _FlacStream
+            self.SAMPLE_RATE, self._channels, bits = _flac_stream_info(path)
+            if bits not in (8, 16, 24, 32):
+                raise ValueError(f"不支持 {bits} 位 FLAC")
+            self._width = bits // 8
+        else:
+            self._stream_class = _WavStream
+            with wave.open(path, "rb") as w:
+                self.SAMPLE_RATE = w.getframerate()
+                self._channels = w.getnchannels()
+                self._width = w.getsampwidth()
+
+    def __enter__(self):
+        assert self.stream is None, "This audio source is already inside a context manager"
+        self.stream = self._stream_class(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class _SyntheticStream:
+    def __init__(self, source):
+        self._source = source
+        self._rng = random.Random(source.seed)
+        self._position = 0  # 已生成的采样数
+        self._pacer = _Pacer(source.SAMPLE_RATE) if source.realtime else None
+
+    def read(self, size):
+        source = self._source
+        total = source.total_samples
+        if not source.loop:
+            if self._position >= total:
+                return b""
+            size = min(size, total - self._position)
+        rate = float(source.SAMPLE_RATE)
+        samples = []
+        for i in range(self._position, self._position + size):
+            t = (i % total) / rate
+            value = self._rng.gauss(0, source.noise_level)
+            if source.is_speech(t):
+                # 带音节包络的基频 + 谐波，近似元音
+                envelope = 0.55 + 0.45 * math.sin(2 * math.pi * 4 * t)
+                value += source.speech_level * envelope * (
+                    math.sin(2 * math.pi * 160 * t) + 0.5 * math.sin(2 * math.pi * 320 * t)
+                    + 0.25 * math.sin(2 * math.pi * 640 * t)) / 1.75
+            samples.append(max(-32768, min(32767, int(value))))
+        self._position += size
+        if self._pacer:
+            self._pacer.wait(size)
+        return struct.pack("<%dh" % size, *samples)
+
+    def close(self):
+        pass
+
+
+class SyntheticAudioSource(AudioSource):
+    """
+    合成音频源
+    script: [(秒数, 'speech' 或 'silence'), ...]，例如 [(0.5, 'silence'), (1.2, 'speech'), (1.0, 'silence')]
+    """
+
+    def __init__(self, script, sample_rate=16000, chunk_size=1024, realtime=False, loop=False,
+                 speech_level=6000, noise_level=60, seed=0):
+        self.script = list(script)
+        self.name = "synthetic"
+        self.realtime = realtime
+        self.loop = loop
+        self.speech_level = speech_level
+        self.noise_level = noise_level
+        self.seed = seed
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = OUTPUT_WIDTH
+        self.CHUNK = chunk_size
+        self.stream = None
+
+        self._segments = []
+        start = 0.0
+        for seconds, kind in self.script:
+            if kind not in ("speech", "silence"):
+                raise ValueError(f"未知的片段类型: {kind}")
+            self._segments.append((start, start + seconds, kind == "speech"))
+            start += seconds
+        self.duration = start
+        self.total_samples = max(1, int(start * sample_rate))
+
+    def is_speech(self, t):
+        for start, end, speech in self._segments:
+            if start <= t < end:
+                return speech
+        return False
+
+    def __enter__(self):
+        assert self.stream is None, "This audio source is already inside a context manager"
+        self.stream = _SyntheticStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
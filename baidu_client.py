@@ -0,0 +1,242 @@
+"""
+百度短语音识别 REST 客户端
+SpeechRecognition 3.10.0 并没有 recognize_baidu 方法，这里直接调用百度智能云接口：
+- access_token 缓存到过期前，不必每次识别都重新获取
+- 使用长连接连接池，识别请求复用已建立的 HTTPS 连接
+- 以 raw 方式直接上传 16kHz 16bit 单声道 PCM，不做 base64/WAV 封装
+- 连接超时和读取超时分开设置（timeout 可以是秒数或 (连接, 读取) 二元组），请求卡住时不会一直阻塞
+
+API Key / Secret Key 从环境变量 BAIDU_API_KEY / BAIDU_SECRET_KEY 读取。
+token_url 和 asr_url 可以指向本地的模拟服务器，便于测试。
+"""
+import http.client
+import json
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+import speech_recognition as sr
+
+TOKEN_URL = "https://aip.baidubce.com/oauth/2.0/token"
+ASR_URL = "https://vop.baidu.com/server_api"
+DEV_PID_MANDARIN = 1537  # 普通话（支持简单的英文识别）
+SAMPLE_RATE = 16000
+
+# 需要重新获取 token 的错误码
+_TOKEN_ERRORS = (3302, 110, 111)
+# 音频质量过差、无法识别的错误码
+_UNRECOGNIZED_ERRORS = (3301,)
+# 服务端错误 / QPS 超限，按 HTTP 503 / 429 处理（见 retry_policy，退避后重试）
+_ERROR_STATUS = {3303: 503, 3304: 429}
+
+
+def _request_error(message, status=None):
+    """sr.RequestError，带上 HTTP 状态码供重试策略判断"""
+    error = sr.RequestError(message)
+    error.status = status
+    return error
+
+
+def _split_timeout(timeout):
+    """秒数或 (连接超时, 读取超时) -> (连接超时, 读取超时)"""
+    if isinstance(timeout, (tuple, list)):
+        return timeout[0], timeout[1]
+    return timeout, timeout
+
+
+class _ConnectionPool:
+    """单个主机的 HTTP(S) 长连接池"""
+
+    def __init__(self, url, maxsize=4, timeout=10):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _new_connection(self):
+        conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return conn_class(self.host, self.port)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _apply_timeout(self, conn, timeout):
+        """新连接按连接超时建立，之后的发送和读取按读取超时"""
+        connect_timeout, read_timeout = _split_timeout(timeout)
+        if conn.sock is None:
+            conn.timeout = connect_timeout
+            conn.connect()
+        conn.sock.settimeout(read_timeout)
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """
+        发送请求，返回 (状态码, 响应内容)；复用的连接已被服务器关闭时自动重连一次
+        timeout: 本次请求的超时（秒数或 (连接, 读取)），None 时使用连接池的默认值
+        """
+        conn, reused = self._acquire()
+        while True:
+            try:
+                self._apply_timeout(conn, timeout if timeout is not None else self.timeout)
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = self._new_connection(), False
+                continue
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class BaiduSpeechClient:
+    """百度短语音识别客户端（线程安全）"""
+
+    def __init__(self, api_key, secret_key, token_url=TOKEN_URL, asr_url=ASR_URL,
+                 dev_pid=DEV_PID_MANDARIN, timeout=10, pool_size=4):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.token_url = token_url
+        self.asr_url = asr_url
+        self.dev_pid = dev_pid
+        self.cuid = uuid.UUID(int=uuid.getnode()).hex[-12:]
+
+        self._token_pool = _ConnectionPool(token_url, maxsize=1, timeout=timeout)
+        self._asr_pool = _ConnectionPool(asr_url, maxsize=pool_size, timeout=timeout)
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self.token_fetches = 0
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """从环境变量创建客户端；未配置密钥时返回 None"""
+        api_key = os.environ.get("BAIDU_API_KEY")
+        secret_key = os.environ.get("BAIDU_SECRET_KEY")
+        if not api_key or not secret_key:
+            return None
+        return cls(api_key, secret_key, **kwargs)
+
+    @property
+    def connections_opened(self):
+        return self._asr_pool.connections_opened
+
+    def get_token(self, force_refresh=False):
+        """获取 access_token，过期前（预留 60 秒余量）一直使用缓存"""
+        with self._token_lock:
+            if not force_refresh and self._token and time.time() < self._token_expires_at:
+                return self._token
+            query = urlencode({
+                "grant_type": "client_credentials",
+                "client_id": self.api_key,
+                "client_secret": self.secret_key,
+            })
+            try:
+                status, data = self._token_pool.request("POST", f"{urlsplit(self.token_url).path}?{query}")
+            except (OSError, http.client.HTTPException) as e:
+                raise sr.RequestError(f"百度 token 请求失败: {e}")
+            self.token_fetches += 1
+            try:
+                payload = json.loads(data.decode("utf-8"))
+            except ValueError:
+                raise _request_error(f"百度 token 响应无法解析 (HTTP {status})", status)
+            if "access_token" not in payload:
+                raise sr.RequestError(f"百度 token 获取失败: {payload.get('error_description') or payload}")
+            self._token = payload["access_token"]
+            self._token_expires_at = time.time() + max(0, int(payload.get("expires_in", 0)) - 60)
+            return self._token
+
+    def invalidate_token(self):
+        with self._token_lock:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    def recognize_pcm(self, pcm_data, rate=SAMPLE_RATE, timeout=None):
+        """
+        识别 16bit 单声道 PCM 数据，返回识别文本
+        timeout: 识别请求的超时（秒数或 (连接, 读取)），None 时使用创建客户端时的 timeout
+        """
+        for attempt in range(2):
+            token = self.get_token()
+            query = urlencode({"dev_pid": self.dev_pid, "cuid": self.cuid, "token": token})
+            headers = {"Content-Type": f"audio/pcm;rate={rate}"}
+            try:
+                status, data = self._asr_pool.request("POST", f"{urlsplit(self.asr_url).path}?{query}", pcm_data, headers,
+                                                      timeout=timeout)
+            except (OSError, http.client.HTTPException) as e:
+                raise sr.RequestError(f"百度识别请求失败: {e}")
+            try:
+                payload = json.loads(data.decode("utf-8"))
+            except ValueError:
+                raise _request_error(f"百度识别响应无法解析 (HTTP {status})", status)
+
+            err_no = payload.get("err_no", -1)
+            if err_no == 0:
+                result = payload.get("result") or []
+                if not result or not result[0].strip():
+                    raise sr.UnknownValueError()
+                return result[0]
+            if err_no in _TOKEN_ERRORS and attempt == 0:
+                # token 失效（如被吊销），刷新后重试一次
+                self.invalidate_token()
+                continue
+            if err_no in _UNRECOGNIZED_ERRORS:
+                raise sr.UnknownValueError()
+            raise _request_error(f"百度识别错误 {err_no}: {payload.get('err_msg', '')}", _ERROR_STATUS.get(err_no))
+
+    def recognize(self, audio_data, timeout=None):
+        """识别 sr.AudioData，必要时转换为 16kHz 16bit"""
+        pcm = audio_data.get_raw_data(
+            convert_rate=None if audio_data.sample_rate == SAMPLE_RATE else SAMPLE_RATE,
+            convert_width=2)
+        return self.recognize_pcm(pcm, SAMPLE_RATE, timeout=timeout)
+
+    def close(self):
+        self._token_pool.close()
+        self._asr_pool.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client():
+    """进程内共享的客户端（切换引擎时 token 和连接池仍然有效）；未配置密钥时返回 None"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = BaiduSpeechClient.from_env()
+        return _default_client
@@ -0,0 +1,292 @@
+"""
+批量转写（命令行，无界面）
+把一批会议录音（WAV / FLAC）转写为 JSONL，不启动 Qt 界面和事件循环，
+复用界面程序的分段器、识别调度（对冲请求 + 熔断）和 _add_punctuation 标点规则。
+
+- 分段：每个文件一个任务，在线程池或进程池（--pool process，分段和 FLAC 解码占 CPU）中执行，
+  片段经有界队列流式送回主进程，文件再长也不会整体载入内存
+- 识别：主进程的线程池并行识别所有文件的片段，同时进行的引擎请求数不超过 --max-in-flight
+- 输出：每个片段识别完成立即写一行 JSON（完成顺序，可按 file / segment 排序还原），
+  文件的所有片段完成后再写一行文件汇总
+- 缓存：--cache 指定结果缓存文件后，重新处理同一批录音时已识别过的片段不再调用引擎
+
+用法:
+    python batch_transcribe.py 会议1.wav 会议2.flac -o result.jsonl
+    python batch_transcribe.py recordings/*.wav --engine baidu --pool process --workers 4 --max-in-flight 8
+    python batch_transcribe.py recordings/*.wav --cache transcribe_cache.jsonl
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import speech_recognition as sr
+
+from audio_sources import FileAudioSource, SyntheticAudioSource
+from engine_dispatch import HedgedDispatcher
+from result_cache import ResultCache
+from segmenter import create_segmenter
+
+ENGINES = {
+    "google": "speech_recognizer.SpeechRecognizer",
+    "baidu": "baidu_speech_simple.BaiduSpeechSimple",
+}
+
+# 分段线程 / 进程通过该队列把片段送回主进程
+_segment_queue = None
+
+
+def _init_worker(segment_queue):
+    global _segment_queue
+    _segment_queue = segment_queue
+
+
+def segment_file(file_index, path, recognizer, pre_roll, phrase_time_limit=30):
+    """
+    对一个文件分段，每个片段放入队列：("segment", 文件序号, 片段序号, 开始秒, 结束秒, 停顿秒, PCM, 采样率, 采样宽度)
+    结束时放入 ("done", 文件序号, 片段数, 音频时长, 错误信息)
+    """
+    count = 0
+    duration = 0.0
+    error = None
+    try:
+        source = FileAudioSource(path)
+        with source:
+            segmenter = create_segmenter(recognizer, source, phrase_time_limit=phrase_time_limit, pre_roll=pre_roll)
+            previous_end = 0.0
+            while True:
+                data = source.stream.read(source.CHUNK)
+                events = segmenter.feed(data) if data else [segmenter.flush()]
+                for event in events:
+                    if event is None or event.kind != "end":
+                        continue
+                    # 与实时监听一致：停顿时间为上一句结束到这一句结束
+                    _segment_queue.put(("segment", file_index, count, event.start, event.end,
+                                        event.end - previous_end, event.audio,
+                                        source.SAMPLE_RATE, source.SAMPLE_WIDTH))
+                    previous_end = event.end
+                    count += 1
+                if not data:
+                    break
+            duration = segmenter.position
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    _segment_queue.put(("done", file_index, count, duration, error))
+
+
+def create_backend(engine):
+    """
+    创建识别后端，只使用它的识别器参数、识别引擎和标点规则；
+    传入空的合成音频源，不初始化麦克风，也不需要 QApplication
+    """
+    module_name, class_name = ENGINES[engine].rsplit(".", 1)
+    engine_class = getattr(importlib.import_module(module_name), class_name)
+    return engine_class(audio_source=SyntheticAudioSource([]))
+
+
+class BatchTranscriber:
+    """批量转写：分段任务扇出到线程池 / 进程池，片段识别扇出到线程池，结果流式写入 JSONL"""
+
+    def __init__(self, output, engine="google", pool="thread", workers=None, concurrency=4,
+                 max_in_flight=4, queue_size=32, cache_path=None):
+        """
+        output: 可写的文本流，每行写一条 JSON
+        engine: 'google' 或 'baidu'（与界面中的两个识别类对应）
+        pool: 分段使用 'thread' 或 'process'
+        workers: 同时分段的文件数，默认为 CPU 核数
+        concurrency: 同时识别的片段数
+        max_in_flight: 同时进行的引擎请求数上限（含对冲请求）
+        queue_size: 已分段、等待识别的片段数上限，满时分段任务阻塞
+        cache_path: 识别结果缓存文件，None 时使用默认缓存（见 result_cache）
+        """
+        self.output = output
+        self.pool = pool
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+
+        self.backend = create_backend(engine)
+        self.backend.dispatcher.shutdown()
+        self.backend.dispatcher = HedgedDispatcher(
+            self.backend.recognition_engines,
+            hedge_delay_ms=self.backend.hedge_delay_ms,
+            max_workers=self.concurrency * len(self.backend.recognition_engines),
+            benign_errors=(sr.UnknownValueError,),
+            max_in_flight=max_in_flight,
+            retry_policy=self.backend.retry_policy)
+        # 不设整句截止时间：片段可能在 max_in_flight 上排队，各请求仍受引擎的连接 / 读取超时限制
+        if cache_path:
+            self.backend.result_cache = ResultCache(path=cache_path)
+
+        self._write_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._files = {}
+        self.stats = {"files": 0, "failed_files": 0, "segments": 0, "errors": 0, "audio_seconds": 0.0}
+
+    def _write(self, record):
+        with self._write_lock:
+            self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.output.flush()
+
+    def run(self, paths):
+        """转写所有文件，返回统计信息"""
+        start = time.perf_counter()
+        if self.pool == "process":
+            manager = multiprocessing.Manager()
+            segment_queue = manager.Queue(self.queue_size)
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                           initargs=(segment_queue,))
+        else:
+            manager = None
+            segment_queue = queue.Queue(self.queue_size)
+            _init_worker(segment_queue)
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="segment")
+
+        recognizer = self.backend.recognizer
+        futures = {}
+        for index, path in enumerate(paths):
+            self._files[index] = {"path": path, "pending": 0, "done": None}
+            futures[index] = executor.submit(segment_file, index, path, recognizer, self.backend.pre_roll)
+
+        recognize_pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch")
+        try:
+            self._dispatch(segment_queue, futures, recognize_pool)
+        finally:
+            recognize_pool.shutdown(wait=True)
+            executor.shutdown(wait=True)
+            self.backend.dispatcher.shutdown()
+            if manager:
+                manager.shutdown()
+        self.stats["elapsed"] = time.perf_counter() - start
+        self.stats["timeouts"] = sum(engine.get('timeouts', 0) for engine in self.backend.dispatcher.stats().values())
+        if self.backend.result_cache is not None:
+            self.stats["cache_hits"] = self.backend.result_cache.hits
+        return self.stats
+
+    def _dispatch(self, segment_queue, futures, recognize_pool):
+        """主循环：从队列取片段交给识别线程池，直到所有文件分段完毕"""
+        remaining = set(futures)
+        while remaining:
+            try:
+                message = segment_queue.get(timeout=0.2)
+            except queue.Empty:
+                # 工作进程崩溃时不会发出 done 消息
+                for index in list(remaining):
+                    future = futures[index]
+                    if future.done() and future.exception() is not None:
+                        remaining.discard(index)
+                        self._segmenting_done(index, 0, 0.0, f"{type(future.exception()).__name__}: {future.exception()}")
+                continue
+
+            if message[0] == "done":
+                _, index, count, duration, error = message
+                remaining.discard(index)
+                self._segmenting_done(index, count, duration, error)
+                continue
+
+            _, index, number, start, end, pause, pcm, sample_rate, sample_width = message
+            # 有界并发：识别线程都忙时不再取片段，分段任务随之在队列上阻塞
+            self._slots.acquire()
+            with self._write_lock:
+                self._files[index]["pending"] += 1
+            audio = sr.AudioData(pcm, sample_rate, sample_width)
+            recognize_pool.submit(self._recognize_segment, index, number, start, end, pause, audio)
+
+    def _recognize_segment(self, index, number, start, end, pause, audio):
+        """识别线程：识别一个片段并写出结果"""
+        began = time.perf_counter()
+        text, error = "", None
+        try:
+            text = self.backend._recognize_audio(audio) or ""
+        except sr.UnknownValueError:
+            pass
+        except Exception as e:
+            error = str(e)
+        finally:
+            self._slots.release()
+        record = {
+            "type": "segment",
+            "file": self._files[index]["path"],
+            "segment": number,
+            "start": round(start, 3),
+            "end": round(end, 3),
+            "text": self.backend._add_punctuation(text, pause) if text else "",
+            "recognize_ms": round((time.perf_counter() - began) * 1000, 1),
+        }
+        if error:
+            record["error"] = error
+        self._write(record)
+        with self._write_lock:
+            self.stats["segments"] += 1
+            if error:
+                self.stats["errors"] += 1
+            state = self._files[index]
+            state["pending"] -= 1
+            finished = state["done"] is not None and state["pending"] == 0
+        if finished:
+            self._file_finished(index)
+
+    def _segmenting_done(self, index, count, duration, error):
+        with self._write_lock:
+            state = self._files[index]
+            state["done"] = (count, duration, error)
+            finished = state["pending"] == 0
+        if finished:
+            self._file_finished(index)
+
+    def _file_finished(self, index):
+        """文件的所有片段都已识别，写出汇总"""
+        with self._write_lock:
+            state = self._files.pop(index, None)
+        if state is None:
+            return
+        count, duration, error = state["done"]
+        record = {"type": "file", "file": state["path"], "segments": count, "duration": round(duration, 3)}
+        if error:
+            record["error"] = error
+        self._write(record)
+        with self._write_lock:
+            self.stats["files"] += 1
+            self.stats["audio_seconds"] += duration
+            if error:
+                self.stats["failed_files"] += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量转写 WAV / FLAC 录音，结果写为 JSONL")
+    parser.add_argument("files", nargs="+", help="WAV / FLAC 文件")
+    parser.add_argument("-o", "--output", help="JSONL 输出文件（默认输出到标准输出）")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="google",
+                        help="google: Google 优先、百度对冲；baidu: 百度优先、Google 对冲")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread", help="分段使用线程池或进程池")
+    parser.add_argument("--workers", type=int, default=None, help="同时分段的文件数（默认 CPU 核数）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时识别的片段数")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="同时进行的引擎请求数上限")
+    parser.add_argument("--cache", help="识别结果缓存文件（JSONL），重复处理时命中的片段不调用引擎")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        transcriber = BatchTranscriber(output, engine=args.engine, pool=args.pool, workers=args.workers,
+                                       concurrency=args.concurrency, max_in_flight=args.max_in_flight,
+                                       cache_path=args.cache)
+        stats = transcriber.run(args.files)
+    finally:
+        if args.output:
+            output.close()
+
+    speed = stats["audio_seconds"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    print(f"完成 {stats['files']} 个文件（失败 {stats['failed_files']}），{stats['segments']} 个片段"
+          f"（识别错误 {stats['errors']}，请求超时 {stats['timeouts']}），音频 {stats['audio_seconds']:.1f} s，"
+          f"耗时 {stats['elapsed']:.1f} s（{speed:.1f}x），缓存命中 {stats.get('cache_hits', 0)}", file=sys.stderr)
+    return 1 if stats["failed_files"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+FLAC 编码基准测试
+比较 SpeechRecognition 自带的外部 flac 程序（每句话启动一次子进程）
+与进程内编码器（flac_encoder.encode_flac）的编码耗时，单位为"每秒音频的毫秒数"。
+这里直接调用 encode_flac 测量进程内编码，不受 FlacAudioData 默认选择的影响。
+--threads 大于 1 时多个线程同时编码（模拟流水线中几句话同时识别），统计每次调用的耗时。
+
+用法:
+    python benchmarks/bench_flac_encode.py [WAV文件] [--seconds 5] [--runs 20] [--threads 1]
+不指定 WAV 文件时使用合成的类语音信号（16kHz 16bit 单声道）。
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from flac_encoder import encode_flac
+
+
+def synthetic_audio(seconds, rate=16000):
+    """带音节包络和噪声的合成信号，压缩特性接近真实语音"""
+    rng = random.Random(0)
+    samples = []
+    for i in range(int(seconds * rate)):
+        t = i / rate
+        envelope = max(0.0, math.sin(2 * math.pi * 3 * t))
+        value = 8000 * envelope * (math.sin(2 * math.pi * 180 * t) + 0.4 * math.sin(2 * math.pi * 1250 * t))
+        samples.append(max(-32768, min(32767, int(value + rng.gauss(0, 200)))))
+    return sr.AudioData(struct.pack("<%dh" % len(samples), *samples), rate, 2)
+
+
+def load_wav(path):
+    with sr.AudioFile(path) as source:
+        return sr.Recognizer().record(source)
+
+
+def measure(encode, runs, threads=1):
+    """threads 个线程各调用 encode runs 次，返回全部调用的耗时和输出字节数"""
+    timings = []
+    sizes = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(runs):
+            start = time.perf_counter()
+            size = len(encode())
+            elapsed = time.perf_counter() - start
+            with lock:
+                timings.append(elapsed)
+                sizes.append(size)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return timings, sizes[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FLAC 编码耗时对比")
+    parser.add_argument("wav", nargs="?", help="WAV 文件（默认使用合成音频）")
+    parser.add_argument("--seconds", type=float, default=5.0, help="合成音频时长")
+    parser.add_argument("--runs", type=int, default=20, help="每种方式的重复次数")
+    parser.add_argument("--threads", type=int, default=1, help="同时编码的线程数")
+    args = parser.parse_args()
+
+    audio = load_wav(args.wav) if args.wav else synthetic_audio(args.seconds)
+    duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+    raw = audio.get_raw_data(convert_width=2)
+
+    cases = [
+        ("subprocess flac", lambda: audio.get_flac_data(convert_width=2)),
+        ("in-process", lambda: encode_flac(raw, audio.sample_rate, 2)),
+    ]
+    print(f"音频时长 {duration:.2f}s, 采样率 {audio.sample_rate}Hz, 每项 {args.runs} 次 × {args.threads} 线程")
+    print(f"{'方式':<18}{'单次 ms':>10}{'中位数 ms/音频秒':>18}{'p90 ms/音频秒':>16}{'输出字节':>12}")
+    for name, encode in cases:
+        encode()  # 预热（首次调用会生成 CRC 查找表）
+        timings, size = measure(encode, args.runs, args.threads)
+        per_second = sorted(t * 1000 / duration for t in timings)
+        p90 = per_second[min(len(per_second) - 1, int(len(per_second) * 0.9))]
+        median_call = statistics.median(timings) * 1000
+        print(f"{name:<18}{median_call:>10.2f}{statistics.median(per_second):>18.2f}{p90:>16.2f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
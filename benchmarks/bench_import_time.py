@@ -0,0 +1,76 @@
+"""
+启动导入耗时基准测试
+用 `python -X importtime` 在新进程中导入 main_ui，统计总耗时和最慢的模块，
+并检查识别后端的重量级依赖没有在窗口出现之前被导入（它们应由 EngineLoader 在后台线程中导入）。
+
+检查失败（导入了禁止的模块，或超过 --budget-ms）时退出码为 1，可用于防止回归。
+
+用法:
+    python benchmarks/bench_import_time.py [--runs 5] [--top 15] [--budget-ms 0]
+    python benchmarks/bench_import_time.py --module speech_recognizer   # 查看某个后端的导入耗时
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main_ui 导入时不应出现的模块（顶层包名）
+FORBIDDEN = ("speech_recognition", "pyaudio", "numpy", "speech_recognizer", "baidu_speech_simple")
+
+
+def profile(module):
+    """返回 [(模块名, 自身 us, 累计 us, 缩进层级), ...]"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import {module}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    if result.returncode != 0:
+        sys.exit(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main_ui 导入耗时分析")
+    parser.add_argument("--module", default="main_ui", help="要分析的模块")
+    parser.add_argument("--runs", type=int, default=5, help="重复次数（取中位数）")
+    parser.add_argument("--top", type=int, default=15, help="显示自身耗时最长的模块数")
+    parser.add_argument("--budget-ms", type=float, default=0, help="总导入耗时上限，0 表示不检查")
+    args = parser.parse_args()
+
+    totals = []
+    entries = []
+    for _ in range(args.runs):
+        entries = profile(args.module)
+        totals.append(next(cumulative for name, _, cumulative, _ in entries if name == args.module) / 1000)
+    total_ms = statistics.median(totals)
+
+    print(f"导入 {args.module}: 中位数 {total_ms:.1f} ms（{args.runs} 次，共 {len(entries)} 个模块）")
+    print(f"{'自身 ms':>10}{'累计 ms':>10}  模块")
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda e: -e[1])[:args.top]:
+        print(f"{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}  {name}")
+
+    failed = False
+    if args.module == "main_ui":
+        imported = {name.split(".")[0] for name, _, _, _ in entries}
+        leaked = [name for name in FORBIDDEN if name in imported]
+        if leaked:
+            print(f"失败: main_ui 导入时加载了后端模块 {leaked}，应改为在 EngineLoader 中按需导入")
+            failed = True
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"失败: 导入耗时 {total_ms:.1f} ms 超过上限 {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+录音回放基准测试
+把 WAV / FLAC 文件（或按脚本生成的合成音频）作为音频源，快于实时地跑完整的
+监听流程（采集服务 → 分段器 → 识别流水线），统计分段结果和实时倍率。
+识别引擎调度替换为只返回语音片段时长的假函数，不访问网络，测的是本地处理开销。
+
+用法:
+    python benchmarks/bench_replay.py recording.wav [--engine baidu]
+    python benchmarks/bench_replay.py --synthetic 20      # 20 句合成语音
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt5.QtCore import QCoreApplication
+
+from audio_sources import FileAudioSource, SyntheticAudioSource
+
+ENGINES = {
+    "google": ("speech_recognizer", "SpeechRecognizer"),
+    "baidu": ("baidu_speech_simple", "BaiduSpeechSimple"),
+}
+
+
+def synthetic_script(utterances):
+    """长度递增的语音，句间停顿 2 秒"""
+    script = [(1.0, "silence")]
+    for i in range(utterances):
+        script += [(1.0 + 0.2 * (i % 10), "speech"), (2.0, "silence")]
+    return script
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录音回放基准测试")
+    parser.add_argument("path", nargs="?", help="WAV / FLAC 文件")
+    parser.add_argument("--synthetic", type=int, default=0, help="不指定文件时生成的合成语音句数")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="google", help="使用的识别类")
+    parser.add_argument("--timeout", type=float, default=600.0, help="最长等待秒数")
+    args = parser.parse_args()
+
+    if args.path:
+        source = FileAudioSource(args.path)
+    else:
+        source = SyntheticAudioSource(synthetic_script(args.synthetic or 10))
+
+    app = QCoreApplication([])
+    module_name, class_name = ENGINES[args.engine]
+    engine_class = getattr(__import__(module_name), class_name)
+    recognizer = engine_class(audio_source=source)
+    recognizer.result_cache = None
+    recognizer.dispatcher.recognize = lambda audio, cancel_token=None: "%.2f" % (len(audio.frame_data) / float(audio.sample_width * audio.sample_rate))
+
+    texts = []
+    errors = []
+    recognizer.text_recognized.connect(texts.append)
+    recognizer.error_occurred.connect(errors.append)
+
+    start = time.perf_counter()
+    recognizer.start_listening()
+    if recognizer.listen_thread is None:
+        app.processEvents()
+        sys.exit(f"无法开始监听: {errors}")
+    recognizer.listen_thread.join(args.timeout)
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+
+    with source:
+        samples = 0
+        while True:
+            data = source.stream.read(65536)
+            if not data:
+                break
+            samples += len(data) // source.SAMPLE_WIDTH
+    duration = samples / float(source.SAMPLE_RATE)
+
+    print(f"音频源: {source.name}，时长 {duration:.1f} s，{source.SAMPLE_RATE} Hz")
+    print(f"处理耗时: {elapsed:.2f} s，实时倍率 {duration / elapsed:.1f}x")
+    print(f"分段数: {len(texts)}")
+    for i, text in enumerate(texts, 1):
+        print(f"  {i:>3}. {text}")
+    for error in errors:
+        print(f"错误: {error}")
+    return 1 if errors or recognizer.is_listening else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
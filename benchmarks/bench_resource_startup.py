@@ -0,0 +1,88 @@
+"""
+资源加载启动耗时基准测试
+比较三种加载图标字体的方式（每次都在新的进程中测量，与真实启动一致）：
+- py-compile: 执行 pyrcc5 生成的 Python 资源模块（每次解析、编译 1.8MB 源码），再从磁盘加载字体
+- py-cached:  同上，但模块已有 __pycache__ 字节码缓存
+- rcc:        QResource.registerResource 注册 icons.rcc（内存映射），字体从资源中加载
+
+Python 资源模块由 pyrcc5 根据 icons.qrc 临时生成。
+
+用法:
+    python benchmarks/bench_resource_startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, os, sys, time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QResource
+from PyQt5.QtGui import QFontDatabase
+app = QApplication([])
+mode, root, module_path = sys.argv[1], sys.argv[2], sys.argv[3]
+start = time.perf_counter()
+if mode == "rcc":
+    assert QResource.registerResource(os.path.join(root, "icons.rcc"))
+    font_id = QFontDatabase.addApplicationFont(":/fonts/FontAwesome.ttf")
+else:
+    if mode == "py-compile":
+        with open(module_path, encoding="utf-8") as f:
+            exec(compile(f.read(), module_path, "exec"), {"__name__": "icons_rc"})
+    else:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("icons_rc", module_path)
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    font_id = QFontDatabase.addApplicationFont(os.path.join(root, "FontAwesome.ttf"))
+elapsed = time.perf_counter() - start
+assert font_id != -1
+print(json.dumps({"load_ms": elapsed * 1000}))
+'''
+
+
+def run_child(mode, module_path):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, ROOT, module_path],
+        check=True, capture_output=True, text=True).stdout
+    total = time.perf_counter() - start
+    return json.loads(output.strip().splitlines()[-1])["load_ms"], total * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资源加载启动耗时对比")
+    parser.add_argument("--runs", type=int, default=10, help="每种方式的进程启动次数")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(ROOT, "icons.rcc")):
+        sys.exit("缺少 icons.rcc，请先运行 python build_resources.py")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        module_path = os.path.join(temp_dir, "icons_rc.py")
+        subprocess.run(["pyrcc5", os.path.join(ROOT, "icons.qrc"), "-o", module_path], check=True)
+        run_child("py-cached", module_path)  # 生成 __pycache__
+
+        print(f"每种方式 {args.runs} 个进程，Python 资源模块 {os.path.getsize(module_path) / 1e6:.1f}MB")
+        print(f"{'方式':<14}{'资源+字体 ms':>14}{'进程总耗时 ms':>16}")
+        for mode in ("py-compile", "py-cached", "rcc"):
+            loads, totals = [], []
+            for _ in range(args.runs):
+                load_ms, total_ms = run_child(mode, module_path)
+                loads.append(load_ms)
+                totals.append(total_ms)
+            print(f"{mode:<14}{statistics.median(loads):>14.1f}{statistics.median(totals):>16.1f}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
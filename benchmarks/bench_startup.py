@@ -0,0 +1,184 @@
+"""
+启动耗时基准测试
+在新进程中无界面地运行 main_ui（offscreen 平台 + benchmarks/fake_audio 中的假 PyAudio），
+记录从启动进程到窗口可用、引擎就绪的各阶段耗时，重复 N 次后输出分位数（JSON）。
+
+阶段（单位 ms）：
+- interpreter:  启动进程到执行第一行代码（解释器启动）
+- import_qt:    导入 PyQt5
+- resources:    注册图标资源（icons.rcc；原来是执行 icons_rc.py）
+- import_main:  导入 main_ui 的其余部分
+- qapplication: 创建 QApplication
+- font:         注册图标字体
+- ui:           构造 SpeechAppUI（不含字体注册）
+- shown:        从启动进程到窗口显示并完成首次事件处理
+- engine_init:  从开始加载引擎到引擎就绪（后台线程，含后端模块导入和麦克风初始化）
+- ready:        从启动进程到引擎就绪
+
+噪声校准缓存写到临时目录，第一次运行会做一次完整校准，之后的运行使用缓存；
+加 --cold-calibration 则每次都重新校准。
+
+用法:
+    python benchmarks/bench_startup.py [--runs 10] [--output startup.json] [--cold-calibration]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_AUDIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_audio")
+PHASES = ("interpreter", "import_qt", "resources", "import_main", "qapplication",
+          "font", "ui", "shown", "engine_init", "ready")
+
+
+def child(spawn_time, engine_timeout):
+    """子进程：按阶段启动程序并打印 JSON"""
+    entered = time.time()
+    phases = {"interpreter": (entered - spawn_time) * 1000}
+    marks = {}
+
+    def timed(name, func):
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                marks[name] = marks.get(name, 0.0) + (time.perf_counter() - start) * 1000
+        return staticmethod(wrapper)
+
+    start = time.perf_counter()
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QResource
+    from PyQt5.QtGui import QFontDatabase
+    phases["import_qt"] = (time.perf_counter() - start) * 1000
+    QResource.registerResource = timed("resources", QResource.registerResource)
+    QFontDatabase.addApplicationFont = timed("font", QFontDatabase.addApplicationFont)
+
+    start = time.perf_counter()
+    import main_ui
+    phases["resources"] = marks.get("resources", 0.0)
+    phases["import_main"] = (time.perf_counter() - start) * 1000 - phases["resources"]
+
+    start = time.perf_counter()
+    app = QApplication([])
+    phases["qapplication"] = (time.perf_counter() - start) * 1000
+
+    ui_class = main_ui.SpeechAppUI
+
+    class TimedUI(ui_class):
+        def __init__(self):
+            start = time.perf_counter()
+            super().__init__()
+            phases["ui"] = (time.perf_counter() - start) * 1000 - marks.get("font", 0.0)
+
+    main_ui.SpeechAppUI = TimedUI
+    loader_load = main_ui.EngineLoader.load
+
+    def load(self, generation, engine_class):
+        marks["engine_start"] = time.perf_counter()
+        loader_load(self, generation, engine_class)
+
+    main_ui.EngineLoader.load = load
+
+    controller = main_ui.MainController(app)
+    controller.show()
+    app.processEvents()
+    phases["font"] = marks.get("font", 0.0)
+    phases["shown"] = (time.time() - spawn_time) * 1000
+
+    deadline = time.perf_counter() + engine_timeout
+    while controller.speech_recognizer is None and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    if controller.speech_recognizer is None:
+        raise SystemExit("引擎初始化超时")
+    phases["engine_init"] = (time.perf_counter() - marks["engine_start"]) * 1000
+    phases["ready"] = (time.time() - spawn_time) * 1000
+    print("BENCH " + json.dumps(phases))
+
+
+def percentiles(values):
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "min": ordered[0], "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99),
+        "max": ordered[-1], "mean": statistics.mean(ordered),
+    }
+
+
+def run_once(env, engine_timeout):
+    spawn_time = time.time()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", repr(spawn_time), "--engine-timeout", str(engine_timeout)],
+        capture_output=True, text=True, env=env, cwd=ROOT)
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"子进程失败 (退出码 {result.returncode}):\n{result.stdout[-1000:]}\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main_ui 启动耗时基准测试")
+    parser.add_argument("--runs", type=int, default=10, help="启动次数")
+    parser.add_argument("--output", help="JSON 结果文件（默认只打印）")
+    parser.add_argument("--cold-calibration", action="store_true", help="每次启动都重新做噪声校准")
+    parser.add_argument("--engine-timeout", type=float, default=30.0, help="等待引擎就绪的秒数")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        child(float(args.child), args.engine_timeout)
+        return 0
+
+    temp_dir = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env.update({
+        "QT_QPA_PLATFORM": "offscreen",
+        "PYTHONPATH": os.pathsep.join([FAKE_AUDIO, ROOT] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])),
+        "RECORDMYTALK_CALIBRATION": os.path.join(temp_dir, "noise_calibration.json"),
+    })
+    env.pop("QT_DEBUG_PLUGINS", None)
+    samples = []
+    try:
+        for i in range(args.runs):
+            if args.cold_calibration and os.path.exists(env["RECORDMYTALK_CALIBRATION"]):
+                os.remove(env["RECORDMYTALK_CALIBRATION"])
+            samples.append(run_once(env, args.engine_timeout))
+            print(f"第 {i + 1}/{args.runs} 次: 窗口 {samples[-1]['shown']:.0f} ms, 就绪 {samples[-1]['ready']:.0f} ms", file=sys.stderr)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    report = {
+        "runs": args.runs,
+        "cold_calibration": args.cold_calibration,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "phases": {name: percentiles([s[name] for s in samples]) for name in PHASES},
+        "samples": samples,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text if not args.output else f"结果已写入 {args.output}")
+
+    print(f"\n{'阶段':<14}{'p50':>10}{'p90':>10}{'max':>10}", file=sys.stderr)
+    for name in PHASES:
+        stats = report["phases"][name]
+        print(f"{name:<14}{stats['p50']:>10.2f}{stats['p90']:>10.2f}{stats['max']:>10.2f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
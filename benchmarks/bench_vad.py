@@ -0,0 +1,114 @@
+"""
+语音分段基准测试
+比较几种"每帧是否为语音"判断方式的 CPU 耗时，单位为"每秒音频的 CPU 毫秒数"：
+- audioop: sr.Recognizer.listen 的做法，逐块 audioop.rms + 动态阈值（Python 3.13 起不可用）
+- EnergySegmenter: array 计算 RMS 的纯 Python 实现
+- VadSegmenter: NumPy 整段计算能量、过零率和平滑语音概率
+
+用法:
+    python benchmarks/bench_vad.py [WAV文件] [--seconds 30] [--runs 5] [--block 1024]
+不指定 WAV 文件时使用合成的"语音 + 停顿 + 背景噪声"信号（16kHz 16bit 单声道）。
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from segmenter import EnergySegmenter, VadSegmenter
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+
+def synthetic_audio(seconds, rate=16000):
+    """2 秒说话、1 秒停顿交替，叠加背景噪声"""
+    rng = random.Random(0)
+    samples = []
+    for i in range(int(seconds * rate)):
+        t = i / rate
+        speaking = t % 3 < 2
+        envelope = max(0.0, math.sin(2 * math.pi * 3 * t)) if speaking else 0.0
+        value = 6000 * envelope * math.sin(2 * math.pi * 180 * t) + rng.gauss(0, 150)
+        samples.append(max(-32768, min(32767, int(value))))
+    return sr.AudioData(struct.pack("<%dh" % len(samples), *samples), rate, 2)
+
+
+def load_wav(path):
+    with sr.AudioFile(path) as source:
+        return sr.Recognizer().record(source)
+
+
+def audioop_baseline(audio, block):
+    """Recognizer.listen 中等待说话阶段的逐块计算"""
+    threshold = 300.0
+    seconds_per_block = block / float(audio.sample_rate)
+    damping = 0.15 ** seconds_per_block
+    data = audio.frame_data
+    step = block * audio.sample_width
+    for offset in range(0, len(data), step):
+        energy = audioop.rms(data[offset:offset + step], audio.sample_width)
+        if energy <= threshold:
+            threshold = threshold * damping + energy * 1.5 * (1 - damping)
+
+
+def run_segmenter(factory, audio, block):
+    segmenter = factory()
+    data = audio.frame_data
+    step = block * audio.sample_width
+    segments = 0
+    for offset in range(0, len(data), step):
+        segments += sum(1 for event in segmenter.feed(data[offset:offset + step]) if event.kind == "end")
+    return segments
+
+
+def measure(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.process_time()
+        func()
+        timings.append(time.process_time() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音分段 CPU 耗时对比")
+    parser.add_argument("wav", nargs="?", help="WAV 文件（默认使用合成音频）")
+    parser.add_argument("--seconds", type=float, default=30.0, help="合成音频时长")
+    parser.add_argument("--runs", type=int, default=5, help="每种方式的重复次数")
+    parser.add_argument("--block", type=int, default=1024, help="每次送入的采样数（与 Microphone.CHUNK 相同）")
+    args = parser.parse_args()
+
+    audio = load_wav(args.wav) if args.wav else synthetic_audio(args.seconds)
+    duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+    rate, width = audio.sample_rate, audio.sample_width
+
+    cases = []
+    if audioop is not None:
+        cases.append(("audioop", lambda: audioop_baseline(audio, args.block)))
+    cases.append(("EnergySegmenter", lambda: run_segmenter(
+        lambda: EnergySegmenter(rate, width, frame_samples=args.block), audio, args.block)))
+    cases.append(("VadSegmenter", lambda: run_segmenter(
+        lambda: VadSegmenter(rate, width), audio, args.block)))
+
+    print(f"音频时长 {duration:.1f}s, 采样率 {rate}Hz, 每块 {args.block} 采样, 每项 {args.runs} 次")
+    print(f"{'方式':<18}{'中位数 CPU ms/音频秒':>22}{'最小值':>10}")
+    for name, func in cases:
+        func()  # 预热
+        per_second = [t * 1000 / duration for t in measure(func, args.runs)]
+        print(f"{name:<18}{statistics.median(per_second):>22.3f}{min(per_second):>10.3f}")
+
+    for name, cls in (("EnergySegmenter", EnergySegmenter), ("VadSegmenter", VadSegmenter)):
+        print(f"{name} 分段数: {run_segmenter(lambda: cls(rate, width), audio, args.block)}")
+
+
+if __name__ == "__main__":
+    main()
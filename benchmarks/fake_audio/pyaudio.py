@@ -0,0 +1,79 @@
+"""
+基准测试用的假 PyAudio 模块
+只在基准测试的子进程中通过 sys.path 引入，用于在没有声卡的机器上无界面地运行程序。
+提供一个 16kHz 的输入设备，按实时速度返回低电平噪声。
+"""
+import random
+import struct
+import time
+
+__version__ = "0.2.14"
+
+paInt16 = 8
+paContinue = 0
+
+_DEVICE = {
+    "index": 0,
+    "name": "Fake Microphone",
+    "hostApi": 0,
+    "maxInputChannels": 1,
+    "maxOutputChannels": 0,
+    "defaultSampleRate": 16000.0,
+}
+
+
+def get_sample_size(format):
+    return 2
+
+
+class Stream:
+    def __init__(self, rate, frames_per_buffer):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self._rng = random.Random(0)
+        self._next = time.monotonic()
+        self._stopped = False
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # 按实时速度产生数据
+        self._next += num_frames / float(self.rate)
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        samples = [int(self._rng.gauss(0, 60)) for _ in range(num_frames)]
+        return struct.pack("<%dh" % num_frames, *samples)
+
+    def is_stopped(self):
+        return self._stopped
+
+    def stop_stream(self):
+        self._stopped = True
+
+    def close(self):
+        self._stopped = True
+
+
+class PyAudio:
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        if index != 0:
+            raise IOError("Invalid device index")
+        return dict(_DEVICE)
+
+    def get_default_input_device_info(self):
+        return dict(_DEVICE)
+
+    def get_host_api_info_by_index(self, index):
+        return {"index": 0, "name": "Fake API"}
+
+    def get_sample_size(self, format):
+        return 2
+
+    def open(self, rate=16000, channels=1, format=paInt16, input=True, input_device_index=None,
+             frames_per_buffer=1024, **kwargs):
+        return Stream(rate, frames_per_buffer)
+
+    def terminate(self):
+        pass
@@ -0,0 +1,201 @@
+"""
+资源编译脚本
+把 icons.qrc 编译为 Qt 二进制资源文件 icons.rcc（与 `rcc -binary` 输出格式相同）。
+程序启动时用 QResource.registerResource 注册该文件，Qt 会直接内存映射，
+不必再执行 1.8MB 的 icons_rc.py。
+
+PyQt5 自带的 pyrcc5 只能生成 Python 代码，不能输出二进制格式，因此这里自行写出：
+文件头 "qres" + 版本号 + 三个区块的偏移；数据区为"4 字节长度 + 原始内容"，
+名称区为"2 字节长度 + 4 字节哈希 + UTF-16 名称"，目录树每个节点 22 字节（格式版本 2）。
+文件不压缩，注册后可以直接映射使用。
+
+图标字体只保留 main_ui.py 中 TIcons 用到的字形（需要 fonttools），426KB 的 FontAwesome
+子集化后只有几 KB。子集中缺少任何一个图标时编译失败。
+
+用法:
+    python build_resources.py [icons.qrc] [-o icons.rcc] [--no-subset]
+"""
+import argparse
+import ast
+import io
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+
+RCC_VERSION = 2
+FLAG_DIRECTORY = 0x02
+LOCALE_C = 1  # QLocale::C
+
+
+def icon_table(source_path, class_name="TIcons"):
+    """从源码中读取图标表（不导入模块），返回 {图标名: 字符}"""
+    with open(source_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), source_path)
+    icons = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            for statement in node.body:
+                if not isinstance(statement, ast.Assign):
+                    continue
+                for target in statement.targets:
+                    names = target.elts if isinstance(target, ast.Tuple) else [target]
+                    values = ast.literal_eval(statement.value)
+                    values = values if isinstance(values, tuple) else (values,)
+                    for name, value in zip(names, values):
+                        icons[name.id] = value
+    if not icons:
+        raise ValueError(f"{source_path} 中没有找到 {class_name}")
+    return icons
+
+
+def subset_font(font_path, icons):
+    """生成只包含 icons 中字形的字体，返回字体内容；缺少字形时抛出 ValueError"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    codepoints = {name: ord(char) for name, char in icons.items()}
+    options = subset.Options()
+    options.layout_features = []
+    options.hinting = False
+    options.glyph_names = False
+    options.notdef_outline = True
+    options.name_IDs = ["*"]  # 保留全部名称记录，字体族名与原字体一致
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=set(codepoints.values()))
+    font = TTFont(font_path)
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.save(output)
+
+    # 重新读取子集字体进行校验
+    cmap = TTFont(io.BytesIO(output.getvalue())).getBestCmap()
+    missing = [f"{name}(U+{cp:04X})" for name, cp in codepoints.items() if cp not in cmap]
+    if missing:
+        raise ValueError(f"{os.path.basename(font_path)} 缺少图标字形: {', '.join(missing)}")
+    return output.getvalue()
+
+
+def qt_hash(name):
+    """Qt 资源名称使用的 qt_hash（按 UTF-16 码元计算）"""
+    h = 0
+    encoded = name.encode("utf-16-be")
+    for i in range(0, len(encoded), 2):
+        h = (h << 4) + ((encoded[i] << 8) | encoded[i + 1])
+        h ^= (h & 0xF0000000) >> 23
+        h &= 0x0FFFFFFF
+    return h
+
+
+class _Node:
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path       # 文件节点的磁盘路径；目录节点为 None
+        self.children = {}
+        self.mtime = 0
+
+
+def parse_qrc(qrc_path):
+    """解析 .qrc，返回资源树的根节点"""
+    base = os.path.dirname(os.path.abspath(qrc_path))
+    root = _Node("")
+    for resource in ET.parse(qrc_path).getroot().iter("qresource"):
+        prefix = [p for p in resource.get("prefix", "/").split("/") if p]
+        for entry in resource.iter("file"):
+            alias = entry.get("alias") or entry.text.strip()
+            parts = prefix + [p for p in alias.replace("\\", "/").split("/") if p]
+            node = root
+            for part in parts[:-1]:
+                node = node.children.setdefault(part, _Node(part))
+            path = os.path.join(base, entry.text.strip())
+            leaf = node.children[parts[-1]] = _Node(parts[-1], path)
+            leaf.mtime = int(os.path.getmtime(path) * 1000)
+    return root
+
+
+def build_rcc(root, overrides=None):
+    """按 rcc 的布局生成二进制资源内容；overrides 为 {磁盘路径: 替换内容}"""
+    overrides = overrides or {}
+    # 节点按广度优先编号，同一目录的子节点按名称哈希排序并连续存放（Qt 按哈希二分查找）
+    order = [root]
+    first_child = {}
+    for node in order:
+        if node.path is None:
+            first_child[id(node)] = len(order)
+            order.extend(sorted(node.children.values(), key=lambda n: qt_hash(n.name)))
+
+    names = bytearray()
+    name_offsets = {}
+    data = bytearray()
+    data_offsets = {}
+    for node in order[1:]:
+        if node.name not in name_offsets:
+            name_offsets[node.name] = len(names)
+            encoded = node.name.encode("utf-16-be")
+            names += struct.pack(">HI", len(encoded) // 2, qt_hash(node.name)) + encoded
+        if node.path is not None:
+            content = overrides.get(node.path)
+            if content is None:
+                with open(node.path, "rb") as f:
+                    content = f.read()
+            data_offsets[id(node)] = len(data)
+            data += struct.pack(">I", len(content)) + content
+
+    tree = bytearray()
+    for node in order:
+        name_offset = name_offsets.get(node.name, 0) if node is not root else 0
+        if node.path is None:
+            tree += struct.pack(">IHII", name_offset, FLAG_DIRECTORY, len(node.children), first_child[id(node)])
+        else:
+            tree += struct.pack(">IHHHI", name_offset, 0, 0, LOCALE_C, data_offsets[id(node)])
+        tree += struct.pack(">Q", node.mtime)
+
+    header_size = 20
+    data_offset = header_size
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+    header = b"qres" + struct.pack(">IIII", RCC_VERSION, tree_offset, data_offset, names_offset)
+    return header + bytes(data) + bytes(names) + bytes(tree)
+
+
+def _files(node):
+    if node.path is not None:
+        yield node.path
+    for child in node.children.values():
+        yield from _files(child)
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="将 .qrc 编译为二进制 .rcc")
+    parser.add_argument("qrc", nargs="?", default=os.path.join(here, "icons.qrc"))
+    parser.add_argument("-o", "--output", default=None, help="输出文件（默认与 .qrc 同名）")
+    parser.add_argument("--icons-source", default=os.path.join(here, "main_ui.py"), help="定义 TIcons 的源文件")
+    parser.add_argument("--no-subset", action="store_true", help="保留完整字体，不做子集化")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.qrc)[0] + ".rcc"
+    root = parse_qrc(args.qrc)
+    overrides = {}
+    if not args.no_subset:
+        icons = icon_table(args.icons_source)
+        for path in _files(root):
+            if path.lower().endswith((".ttf", ".otf")):
+                try:
+                    overrides[path] = subset_font(path, icons)
+                except ImportError:
+                    print("字体子集化需要 fonttools：pip install fonttools（或使用 --no-subset）")
+                    return 1
+                except ValueError as e:
+                    print(f"错误: {e}")
+                    return 1
+                print(f"{os.path.basename(path)}: {os.path.getsize(path)} -> {len(overrides[path])} 字节（{len(icons)} 个图标）")
+    content = build_rcc(root, overrides)
+    with open(output, "wb") as f:
+        f.write(content)
+    print(f"已生成 {output}（{len(content)} 字节）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+取消令牌
+停止监听时，一个令牌同时通知采集、分段和识别：
+- 采集服务立即停止读取并释放设备（在调用 cancel 的线程中同步完成）
+- 分段器在下一帧之前抛出 Cancelled，不再把缓冲中的音频拼成一句
+- 识别调度不再等待进行中的请求，流水线丢弃尚未交付的结果
+每个监听会话使用一个新的令牌。
+子令牌（CancellationToken(parent=...)）随父令牌一起取消，也可以单独取消，
+用于会话中可单独作废的操作（如停顿后又开始说话时作废的提前识别）。
+"""
+import threading
+
+
+class Cancelled(Exception):
+    """操作已被取消（如停止监听）"""
+
+
+class CancellationToken:
+    """取消令牌（线程安全）"""
+
+    def __init__(self, parent=None):
+        """parent: 父令牌，父令牌取消时这个令牌也取消"""
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._parent = parent
+        if parent is not None:
+            parent.register(self.cancel)
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def is_set(self):
+        """与 threading.Event 相同的接口，可直接作为 RetryPolicy.call 的 cancel_event"""
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """等待取消，返回是否已取消"""
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        """取消；已注册的回调在当前线程中依次调用，只调用一次"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"取消回调出错: {e}")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def register(self, callback):
+        """注册取消时调用的回调；已取消时立即调用"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def unregister(self, callback):
+        """注销回调（操作正常结束后调用，避免长会话中回调不断累积）"""
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def detach(self):
+        """从父令牌注销（子令牌对应的操作结束后调用）"""
+        if self._parent is not None:
+            self._parent.unregister(self.cancel)
+            self._parent = None
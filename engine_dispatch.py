@@ -0,0 +1,216 @@
+"""
+识别引擎调度模块
+同一段语音按优先级发往多个识别引擎（对冲请求）：先发给首选引擎，
+若在 hedge_delay_ms 毫秒内没有结果、或首选引擎出错，立即再发给下一个引擎。
+返回最先得到的非空结果，其余请求被取消或忽略。
+已熔断的引擎会被跳过，直到半开探测成功（见 engine_health）。
+每个引擎请求出错时按 retry_policy 重试（连接重置立即重试，超时 / 5xx / 限流退避重试），
+同一次识别的所有请求（含对冲和重试）共用一个截止时间（deadline），到时仍无结果抛出 RecognitionTimeout。
+传入取消令牌时，取消后立即抛出 Cancelled，不再等待进行中的请求。
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from cancellation import Cancelled
+from engine_health import EngineHealthTracker
+from retry_policy import is_timeout
+
+
+class RecognitionTimeout(TimeoutError):
+    """整句识别超过截止时间"""
+
+
+class HedgedDispatcher:
+    """对冲式识别调度器"""
+
+    def __init__(self, engines, hedge_delay_ms=800, max_workers=None,
+                 health=None, benign_errors=(), max_in_flight=None, retry_policy=None, deadline=None):
+        """
+        engines: 引擎配置列表，每项为 {'name': ..., 'method': callable(audio)}，按优先级排列
+        hedge_delay_ms: 首选引擎多少毫秒无结果后再请求下一个引擎；
+                        0 表示同时请求所有引擎，None 表示只在出错时才切换（顺序回退）
+        max_workers: 线程池大小，默认为引擎数的 4 倍（流水线可能同时识别多句）
+        health: EngineHealthTracker 实例，默认新建
+        benign_errors: 不计为引擎故障的异常类型（如"未识别到语音"）
+        max_in_flight: 同时进行的引擎请求数上限（含对冲请求），None 表示不限制
+        retry_policy: RetryPolicy 实例，None 表示出错不重试
+        deadline: 每次识别的截止秒数，None 表示不限制（各请求仍受引擎自身的超时限制）
+        """
+        self.engines = list(engines)
+        self.hedge_delay_ms = hedge_delay_ms
+        self.health = health or EngineHealthTracker()
+        self.benign_errors = tuple(benign_errors)
+        self.retry_policy = retry_policy
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, len(self.engines) * 4),
+            thread_name_prefix="recognize")
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.wins = {engine['name']: 0 for engine in self.engines}
+
+    def recognize(self, audio, cancel_token=None):
+        """
+        识别一段语音，返回最先得到的非空结果；全部失败时抛出最后一个错误
+        cancel_token: cancellation.CancellationToken，取消后立即抛出 Cancelled
+        """
+        if not self.engines:
+            raise Exception("没有可用的识别引擎")
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        candidates = list(self.engines)
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        finished = threading.Event()  # 已得到结果或已取消后，其余引擎不再重试
+        # 取消时完成的 Future，和引擎请求一起等待，取消能立即唤醒等待
+        cancelled = Future()
+        on_cancel = None
+        if cancel_token is not None:
+            def on_cancel():
+                finished.set()
+                cancelled.set_result(None)
+            cancel_token.register(on_cancel)
+
+        pending = {}
+
+        def launch():
+            # 跳过熔断中的引擎，返回下一次对冲的时间点；没有可用引擎时返回 False
+            while candidates:
+                engine = candidates.pop(0)
+                if self.health.get(engine['name']).allow_request():
+                    self._submit(engine, audio, pending, deadline, finished)
+                    return self._next_launch_time()
+            return False
+
+        next_launch = launch()
+        if next_launch is False:
+            # 所有引擎都已熔断：仍向首选引擎发一个请求，避免完全不可用
+            next_launch = None
+            self._submit(self.engines[0], audio, pending, deadline, finished)
+
+        try:
+            return self._wait_results(pending, candidates, launch, next_launch, deadline, cancelled)
+        finally:
+            finished.set()
+            if on_cancel is not None:
+                cancel_token.unregister(on_cancel)
+
+    def _wait_results(self, pending, candidates, launch, next_launch, deadline=None, cancelled=None):
+        """等待各引擎的结果，按对冲延迟和出错情况依次请求后续引擎，直到截止时间或取消"""
+        last_error = None
+        while pending:
+            timeout = None
+            if candidates and next_launch is not None:
+                timeout = max(0.0, next_launch - time.monotonic())
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            waiting = list(pending) + ([cancelled] if cancelled is not None else [])
+            done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if cancelled is not None and cancelled.done():
+                self._abandon(pending, deadline_miss=False)
+                raise Cancelled()
+            if not done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._abandon(pending)
+                    raise RecognitionTimeout(f"识别超时（{self.deadline:g} 秒内没有结果）")
+                # 对冲延迟已到，首选引擎仍未返回
+                next_launch = launch()
+                continue
+
+            failed = False
+            for future in done:
+                engine = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    failed = True
+                    continue
+                if result and result.strip():
+                    self._record_win(engine['name'])
+                    for other, other_engine in pending.items():
+                        # 尚未开始的请求直接取消，进行中的结果被忽略
+                        if other.cancel():
+                            self.health.get(other_engine['name']).record_cancelled()
+                    return result
+
+            if candidates and (failed or not pending):
+                # 出错（或返回空结果）的引擎不必等对冲延迟，直接请求下一个
+                next_launch = launch()
+
+        if last_error:
+            raise last_error
+        raise Exception("所有识别引擎都无法识别语音")
+
+    def _abandon(self, pending, deadline_miss=True):
+        """
+        不再等待：取消尚未开始的请求；进行中的请求由其自身的超时结束，
+        deadline_miss 为 True（截止时间已到）时计入该引擎的超时统计
+        """
+        for future, engine in pending.items():
+            health = self.health.get(engine['name'])
+            if future.cancel():
+                health.record_cancelled()
+            elif deadline_miss:
+                health.record_deadline_miss()
+
+    def _submit(self, engine, audio, pending, deadline=None, finished=None):
+        future = self._executor.submit(self._call_engine_with_retry, engine, audio, deadline, finished)
+        pending[future] = engine
+
+    def _call_engine_with_retry(self, engine, audio, deadline=None, finished=None):
+        """
+        按重试策略调用引擎并记录健康状态
+        每次重试都计入并发上限，但健康统计按一次请求只记录一次：重试后成功算成功，
+        重试全部失败才算一次失败，一句话的几次 503 重试不会单独让熔断器打开
+        """
+        health = self.health.get(engine['name'])
+        attempt_start = [time.monotonic()]  # 最后一次尝试的开始时间，延迟只统计这一次
+
+        def attempt():
+            attempt_start[0] = time.monotonic()
+            return self._call_engine(engine, audio)
+
+        try:
+            if self.retry_policy is None:
+                result = attempt()
+            else:
+                result = self.retry_policy.call(attempt, deadline=deadline, cancel_event=finished)
+        except self.benign_errors:
+            health.record_success(time.monotonic() - attempt_start[0])
+            raise
+        except Exception as e:
+            health.record_failure(e, time.monotonic() - attempt_start[0], timeout=is_timeout(e))
+            raise
+        health.record_success(time.monotonic() - attempt_start[0])
+        return result
+
+    def _call_engine(self, engine, audio):
+        """调用引擎（受并发上限限制）"""
+        if self._in_flight is None:
+            return engine['method'](audio)
+        with self._in_flight:
+            return engine['method'](audio)
+
+    def _next_launch_time(self):
+        if self.hedge_delay_ms is None:
+            return None
+        return time.monotonic() + self.hedge_delay_ms / 1000.0
+
+    def _record_win(self, name):
+        with self._lock:
+            self.wins[name] = self.wins.get(name, 0) + 1
+
+    def stats(self):
+        """各引擎的健康状态及胜出次数"""
+        stats = self.health.snapshot()
+        with self._lock:
+            for name, wins in self.wins.items():
+                stats.setdefault(name, {'name': name})['wins'] = wins
+        return stats
+
+    def shutdown(self):
+        """关闭线程池，不等待仍在进行的请求"""
+        self._executor.shutdown(wait=False)
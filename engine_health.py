@@ -0,0 +1,150 @@
+"""
+识别引擎健康状态模块
+为每个识别引擎记录成功/失败次数和延迟，并实现熔断器：
+连续失败达到阈值后熔断（open），熔断期间调度器直接跳过该引擎；
+冷却时间到后进入半开（half_open）状态，只放行一个探测请求，
+探测成功则恢复（closed），失败则重新熔断并加倍冷却时间。
+超时单独计数：请求本身超时（timeouts），以及整句截止时间到时仍未返回（deadline_misses）。
+"""
+import threading
+import time
+
+
+class EngineHealth:
+    """单个识别引擎的健康状态与熔断器"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, max_reset_timeout=300.0):
+        """
+        failure_threshold: 连续失败多少次后熔断
+        reset_timeout: 熔断后多少秒进入半开状态
+        max_reset_timeout: 探测连续失败时冷却时间的上限
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+
+        self.state = self.CLOSED
+        self.reset_timeout = reset_timeout
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.deadline_misses = 0
+        self.latency_avg = None  # 指数加权平均延迟（秒）
+        self.last_error = None
+
+    def allow_request(self):
+        """是否允许向该引擎发送请求；半开状态下只放行一个探测请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self, latency):
+        """记录一次成功的请求（包括"未识别到语音"这类引擎本身正常的结果）"""
+        with self._lock:
+            self.requests += 1
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._update_latency(latency)
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                self.reset_timeout = self.base_reset_timeout
+            self.probe_in_flight = False
+
+    def record_failure(self, error, latency, timeout=False):
+        """记录一次失败的请求；timeout 表示请求超时（连接或读取）"""
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            if timeout:
+                self.timeouts += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self._update_latency(latency)
+            if self.state == self.HALF_OPEN:
+                # 探测失败，重新熔断并延长冷却时间
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self.probe_in_flight = False
+
+    def record_deadline_miss(self):
+        """整句识别的截止时间已到，该引擎的请求仍未返回（请求的最终结果另行记录）"""
+        with self._lock:
+            self.deadline_misses += 1
+
+    def record_cancelled(self):
+        """请求尚未发出就被取消，释放探测名额"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def _update_latency(self, latency):
+        if self.latency_avg is None:
+            self.latency_avg = latency
+        else:
+            self.latency_avg = self.latency_avg * 0.8 + latency * 0.2
+
+    def snapshot(self):
+        """返回当前统计信息"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self.state,
+                'requests': self.requests,
+                'successes': self.successes,
+                'failures': self.failures,
+                'consecutive_failures': self.consecutive_failures,
+                'skipped': self.skipped,
+                'timeouts': self.timeouts,
+                'deadline_misses': self.deadline_misses,
+                'latency_avg': self.latency_avg,
+                'last_error': self.last_error,
+            }
+
+
+class EngineHealthTracker:
+    """所有识别引擎的健康状态集合"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """获取（必要时创建）某个引擎的健康状态"""
+        with self._lock:
+            health = self._engines.get(name)
+            if health is None:
+                health = EngineHealth(name, self.failure_threshold, self.reset_timeout)
+                self._engines[name] = health
+            return health
+
+    def snapshot(self):
+        """返回所有引擎的统计信息"""
+        with self._lock:
+            engines = list(self._engines.values())
+        return {health.name: health.snapshot() for health in engines}
@@ -0,0 +1,265 @@
+"""
+进程内 FLAC 编码器
+recognize_google 通过 AudioData.get_flac_data() 为每句话启动一次外部 flac 程序，
+在 Windows 上进程启动的开销远大于编码本身。这里用 NumPy 实现一个精简的 FLAC 编码器：
+固定阶数预测（FIXED 0~4 阶，按残差最小选择）+ Rice 编码，输出标准 FLAC 流。
+残差计算、Rice 比特打包和帧 CRC 都是整块向量化计算的。
+
+FlacAudioData 是 sr.AudioData 的子类，可以直接传给 recognize_google。
+编码方式按平台选择（PREFER_SUBPROCESS）：
+- Windows（本程序的目标平台，SpeechRecognition 自带 flac-win32.exe）：默认使用本编码器，
+  省去每句话一次的进程创建
+- 其他平台：benchmarks/bench_flac_encode.py 显示 fork/exec 很便宜，C 实现的 flac 程序更快
+  （Linux，5 秒音频单线程约 3.8 ms 对 6.8 ms，4 线程同时编码约 15 ms 对 27 ms），
+  默认使用外部 flac 程序，找不到 flac 程序时才使用本编码器
+未安装 NumPy 时总是使用外部 flac 程序。
+"""
+import os
+import struct
+import sys
+import threading
+
+import speech_recognition as sr
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+BLOCK_SIZE = 4096
+# 有可用的外部 flac 程序时是否优先使用；Windows 上进程创建开销大，默认始终使用进程内编码
+PREFER_SUBPROCESS = sys.platform != "win32"
+MAX_RICE_PARAM = 14  # 4 位参数，15 保留为 escape
+
+# 帧头中的采样率编码（其他采样率从 STREAMINFO 读取）
+_SAMPLE_RATE_CODES = {
+    88200: 0b0001, 176400: 0b0010, 192000: 0b0011, 8000: 0b0100, 16000: 0b0101,
+    22050: 0b0110, 24000: 0b0111, 32000: 0b1000, 44100: 0b1001, 48000: 0b1010, 96000: 0b1011,
+}
+_SAMPLE_SIZE_CODES = {8: 0b001, 12: 0b010, 16: 0b100, 20: 0b101, 24: 0b110}
+
+_CRC16_POLY = 0x8005
+_crc16_matrix = None
+_crc16_lock = threading.Lock()
+
+
+def _crc8(data):
+    """帧头 CRC-8（多项式 0x07），帧头只有十几个字节，逐位计算即可"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def _crc16_bit_matrix(bit_count):
+    """
+    CRC 在 GF(2) 上是线性的：消息中距末尾 k 位的比特为 1 时，贡献 x^(k+16) mod P。
+    把这些贡献展开成 (比特数 x 16) 的 0/1 矩阵（按距末尾的距离倒序存放），
+    整帧 CRC 的每一位就是"消息比特 · 矩阵列"的奇偶性，一次矩阵乘法即可算完。
+    矩阵按需扩展并缓存，返回最后 bit_count 行。
+    """
+    global _crc16_matrix
+    with _crc16_lock:
+        matrix = _crc16_matrix
+        if matrix is None or len(matrix) < bit_count:
+            size = max(bit_count, 1 << 17)
+            powers = [0] * size
+            value = _CRC16_POLY  # x^16 mod P
+            for k in range(size):
+                powers[k] = value
+                value = ((value << 1) ^ _CRC16_POLY) & 0xFFFF if value & 0x8000 else (value << 1) & 0xFFFF
+            powers = np.array(powers[::-1], dtype=np.int64)
+            matrix = ((powers[:, None] >> np.arange(16)) & 1).astype(np.float32)
+            _crc16_matrix = matrix
+        return matrix[len(matrix) - bit_count:]
+
+
+def _crc16(data):
+    """帧 CRC-16（多项式 0x8005，初值 0）"""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8)).astype(np.float32)
+    counts = bits @ _crc16_bit_matrix(bits.size)  # float32 对 2^24 以内的整数计数是精确的
+    parity = counts.astype(np.int64) & 1
+    return int((parity << np.arange(16)).sum())
+
+
+def _utf8_number(value):
+    """FLAC 帧号使用类 UTF-8 变长编码"""
+    if value < 0x80:
+        return bytes([value])
+    length = 2
+    while value >= 1 << (5 * length + 1):
+        length += 1
+    out = []
+    for _ in range(length - 1):
+        out.append(0x80 | (value & 0x3F))
+        value >>= 6
+    out.append(((0xFF00 >> length) & 0xFF) | value)
+    return bytes(reversed(out))
+
+
+def _samples_from_pcm(pcm, sample_width):
+    """小端有符号 PCM 转为 int64 数组"""
+    if sample_width == 2:
+        return np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2).astype(np.int64)
+    if sample_width == 3:
+        raw = np.frombuffer(pcm, dtype=np.uint8, count=len(pcm) - len(pcm) % 3).reshape(-1, 3).astype(np.int64)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return np.where(values & 0x800000, values - (1 << 24), values)
+    raise ValueError("只支持 16/24 位 PCM")
+
+
+def _pack_codes(values, lengths):
+    """
+    把一串变长码字（values[i] 写成 lengths[i] 位，大端）拼接成字节串，末尾补零到整字节。
+    码字的有效位不超过 25 位，最多跨两个 32 位字：按所在的字分别累加
+    （各码字的比特互不重叠，相加即按位或），用 bincount 一次完成。
+    """
+    ends = np.cumsum(lengths)
+    total = int(ends[-1]) if ends.size else 0
+    word_count = (total + 31) // 32 + 1
+    end_word = (ends - 1) // 32
+    end_used = ends - end_word * 32  # 码字最后一位在该字中占用到的位数（1~32）
+    low = (values << (32 - end_used)) & 0xFFFFFFFF
+    high = values >> end_used
+    words = np.bincount(end_word, weights=low, minlength=word_count)
+    spill = high > 0
+    if spill.any():
+        words += np.bincount(end_word[spill] - 1, weights=high[spill], minlength=word_count)
+    return words.astype(">u4").tobytes()[:(total + 7) // 8]
+
+
+def _rice_codes(residual):
+    """为残差选择 Rice 参数，返回 (参数, 码字, 码长)"""
+    folded = np.where(residual >= 0, residual << 1, ((-residual) << 1) - 1)
+    count = folded.size
+    mean = int(folded.sum()) // count if count else 0
+    guess = max(0, min(MAX_RICE_PARAM, mean.bit_length() - 1))
+    best_param, best_cost = guess, None
+    for candidate in (guess - 1, guess, guess + 1):
+        if 0 <= candidate <= MAX_RICE_PARAM:
+            cost = int((folded >> candidate).sum()) + count * (candidate + 1)
+            if best_cost is None or cost < best_cost:
+                best_param, best_cost = candidate, cost
+
+    # 每个残差编码为 q 个 0 加 "1 + 低 k 位"，即把 (1<<k)|低位 写成 q+k+1 位
+    k = best_param
+    words = (folded & ((1 << k) - 1)) | (1 << k)
+    lengths = (folded >> k) + 1 + k
+    return k, words, lengths
+
+
+def _encode_subframe(block, bits):
+    """编码单声道子帧，返回字节串（末尾补零对齐）"""
+    mask = (1 << bits) - 1
+    if not np.any(block != block[0]):
+        # CONSTANT 子帧（如静音）
+        return _pack_codes(np.array([0, int(block[0]) & mask], dtype=np.int64),
+                           np.array([8, bits], dtype=np.int64))
+
+    best = None
+    residual = block
+    for order in range(5):
+        if order:
+            if block.size <= order:
+                break
+            residual = np.diff(residual)
+        cost = int(np.abs(residual).sum())
+        if best is None or cost < best[0]:
+            best = (cost, order, residual)
+    _, order, residual = best
+
+    param, words, lengths = _rice_codes(residual)
+    if order * bits + 10 + int(lengths.sum()) >= block.size * bits:
+        # 压缩无收益（如白噪声），使用 VERBATIM 子帧
+        values = np.concatenate([[0b00000010], block & mask])
+        return _pack_codes(values, np.concatenate([[8], np.full(block.size, bits)]))
+
+    # 子帧头 0 001xxx 0，预热样本，残差编码方式 00 + 分区阶数 0000 + 4 位 Rice 参数，残差
+    values = np.concatenate([[0b00010000 | (order << 1)], block[:order] & mask, [param], words])
+    lengths = np.concatenate([[8], np.full(order, bits), [10], lengths])
+    return _pack_codes(values.astype(np.int64), lengths.astype(np.int64))
+
+
+def _frame_header(frame_number, block_size, sample_rate, bits):
+    if block_size == BLOCK_SIZE:
+        block_code, block_tail = 0b1100, b""
+    else:
+        block_code, block_tail = 0b0111, struct.pack(">H", block_size - 1)
+    rate_code = _SAMPLE_RATE_CODES.get(sample_rate, 0)
+    size_code = _SAMPLE_SIZE_CODES.get(bits, 0)
+    header = bytes([
+        0xFF, 0xF8,  # 同步码 + 固定块大小
+        (block_code << 4) | rate_code,
+        (0 << 4) | (size_code << 1),  # 单声道
+    ]) + _utf8_number(frame_number) + block_tail
+    return header + bytes([_crc8(header)])
+
+
+def encode_flac(pcm, sample_rate, sample_width=2):
+    """
+    将单声道小端有符号 PCM 编码为 FLAC 字节流
+    sample_width: 2（16 位）或 3（24 位）
+    """
+    bits = sample_width * 8
+    samples = _samples_from_pcm(pcm, sample_width)
+    total = samples.size
+
+    frames = []
+    min_frame, max_frame = None, 0
+    for frame_number, start in enumerate(range(0, total, BLOCK_SIZE)):
+        block = samples[start:start + BLOCK_SIZE]
+        frame = _frame_header(frame_number, block.size, sample_rate, bits)
+        frame += _encode_subframe(block, bits)
+        frame += struct.pack(">H", _crc16(frame))
+        frames.append(frame)
+        min_frame = len(frame) if min_frame is None else min(min_frame, len(frame))
+        max_frame = max(max_frame, len(frame))
+
+    # 最后一块可以小于最小块大小，因此两项都写 BLOCK_SIZE
+    streaminfo = struct.pack(">HH", BLOCK_SIZE, BLOCK_SIZE)
+    streaminfo += (min_frame or 0).to_bytes(3, "big") + max_frame.to_bytes(3, "big")
+    packed = (sample_rate << 44) | (0 << 41) | ((bits - 1) << 36) | total
+    streaminfo += packed.to_bytes(8, "big") + b"\x00" * 16  # MD5 留空表示未计算
+    metadata = bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo
+    return b"fLaC" + metadata + b"".join(frames)
+
+
+_flac_converter = None
+
+
+def flac_converter_available():
+    """是否有可执行的外部 flac 程序（安装的或 SpeechRecognition 自带的），结果缓存"""
+    global _flac_converter
+    if _flac_converter is None:
+        try:
+            path = sr.get_flac_converter()
+            _flac_converter = os.path.isfile(path) and os.access(path, os.X_OK)
+        except OSError:
+            _flac_converter = False
+    return _flac_converter
+
+
+class FlacAudioData(sr.AudioData):
+    """get_flac_data 在没有外部 flac 程序时使用进程内编码器的 AudioData"""
+
+    @classmethod
+    def from_audio(cls, audio_data):
+        if isinstance(audio_data, cls):
+            return audio_data
+        return cls(audio_data.frame_data, audio_data.sample_rate, audio_data.sample_width)
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        width = convert_width or self.sample_width
+        if NUMPY_AVAILABLE and not (PREFER_SUBPROCESS and flac_converter_available()):
+            if width not in (2, 3):
+                width = 2
+            try:
+                raw = self.get_raw_data(convert_rate, width)
+                return encode_flac(raw, convert_rate or self.sample_rate, width)
+            except Exception:
+                pass
+        # 外部 flac 程序（SpeechRecognition 自带的实现）
+        return super().get_flac_data(convert_rate, convert_width)
@@ -17,24 +17,20 @@ sys.excepthook = excepthook
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QTextEdit, QPushButton, QLabel, QComboBox,
                              QFrame, QSpacerItem, QSizePolicy, QGraphicsDropShadowEffect)
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QIcon, QColor, QFontDatabase
-
-# 导入编译后的资源文件
-try:
-    # 用绝对路径加载 icons_rc.py
-    import importlib.util
-    icons_rc_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons_rc.py')
-    spec = importlib.util.spec_from_file_location('icons_rc', icons_rc_path)
-    icons_rc = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(icons_rc)
-except Exception as e:
-    print(f"CRITICAL: icons_rc.py not found or failed to load: {e}")
-    sys.exit(1)
-
-# 导入后端逻辑
-from speech_recognizer import SpeechRecognizer
-from baidu_speech_simple import BaiduSpeechSimple
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QTimer, QObject, QCoreApplication, QResource
+import threading
+import importlib
+from PyQt5.QtGui import QFont, QIcon, QColor, QFontDatabase, QFontMetrics, QTextCursor, QTextCharFormat
+
+# 注册编译后的二进制资源（由 build_resources.py 生成，Qt 直接内存映射）
+RESOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCES_LOADED = QResource.registerResource(os.path.join(RESOURCE_DIR, 'icons.rcc'))
+if not RESOURCES_LOADED:
+    print("WARNING: icons.rcc not found or invalid, run build_resources.py to regenerate it")
+
+# 后端模块（speech_recognition、PyAudio 等）不在这里导入，
+# 由 EngineLoader 在后台线程中按需导入，见 load_engine_class
+# （打包时这些模块需列在 main_ui.spec 的 hiddenimports 中）
 
 class TColors:
     # 更现代的配色方案 - 基于Material Design 3
@@ -395,8 +391,11 @@ class SpeechAppUI(QMainWindow):
         self.setGeometry(100, 100, 580, 720)
         self.setMinimumSize(500, 640)
         
-        # 加载字体
-        font_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'FontAwesome.ttf')
+        # 加载字体（只加载一次，优先使用资源文件中的字体）
+        if RESOURCES_LOADED:
+            font_path = ':/fonts/FontAwesome.ttf'
+        else:
+            font_path = os.path.join(RESOURCE_DIR, 'FontAwesome.ttf')
         font_id = QFontDatabase.addApplicationFont(font_path)
         if font_id == -1:
             print(f"[DEBUG] CRITICAL: FontAwesome.ttf could not be loaded from {font_path}!")
@@ -411,6 +410,12 @@ class SpeechAppUI(QMainWindow):
                  font_name = font_families[0]
                  self.icon_font = QFont(font_name, 15)
                  print(f"[DEBUG] Using font family: '{font_name}'")
+                 # 资源中的字体是按 TIcons 生成的子集，新增图标后需要重新运行 build_resources.py
+                 metrics = QFontMetrics(self.icon_font)
+                 missing = [name for name, char in vars(TIcons).items()
+                            if not name.startswith('_') and not metrics.inFontUcs4(ord(char))]
+                 if missing:
+                     print(f"[DEBUG] WARNING: icon font is missing glyphs for {missing}, run build_resources.py")
 
         self.is_always_on_top = False
         
@@ -457,6 +462,8 @@ class SpeechAppUI(QMainWindow):
         
         # 文本输入区域
         self.text_edit = QTextEdit()
+        # 临时结果在文档中的范围（两个 QTextCursor，随用户编辑自动调整位置）及所属句子序号；None 表示没有临时结果
+        self.partial_start = self.partial_end = self.partial_utterance = None
         self.text_edit.setPlaceholderText("点击麦克风开始识别")
         self.text_edit.setStyleSheet(f"""
             QTextEdit {{
@@ -536,7 +543,7 @@ class SpeechAppUI(QMainWindow):
         bottom_layout.addLayout(actions_layout)
         
         self.text_edit.textChanged.connect(self.update_char_count)
-        self.clear_button.clicked.connect(lambda: self.text_edit.clear())
+        self.clear_button.clicked.connect(self.clear_text)
         self.copy_button.clicked.connect(self.copy_text)
         
         layout.addWidget(self.text_edit)
@@ -585,7 +592,7 @@ class SpeechAppUI(QMainWindow):
         self.show()
 
     def copy_text(self):
-        text = self.text_edit.toPlainText()
+        text = self.committed_text()
         if text.strip():
             QApplication.clipboard().setText(text)
             # 简单的视觉反馈 - 短暂改变按钮颜色
@@ -617,16 +624,65 @@ class SpeechAppUI(QMainWindow):
         """)
         self.copy_button.setFont(self.icon_font)  # 确保字体不丢失
 
-    def update_char_count(self): self.char_count_label.setText(f"{len(self.text_edit.toPlainText())} 字符")
+    def update_char_count(self): self.char_count_label.setText(f"{len(self.committed_text())} 字符")
     def keyPressEvent(self, event): (self.toggle_recording() if event.key() == Qt.Key_Space else super().keyPressEvent(event))
     def set_engine_list(self, engines): 
         for key, config in engines.items():
             self.engine_selector.add_engine(key, config['name'])
     
+    def clear_text(self):
+        self.partial_start = self.partial_end = self.partial_utterance = None
+        self.text_edit.clear()
+    
+    def committed_text(self):
+        """文本框中除临时结果以外的内容"""
+        text = self.text_edit.toPlainText()
+        if self.partial_start is None: return text
+        return text[:self.partial_start.position()] + text[self.partial_end.position():]
+    
     def on_text_recognized(self, text): 
-        self.text_edit.append(text)
+        if self.partial_start is None:
+            self.text_edit.append(text)
+        else:
+            # 正在显示后一句话的临时结果（流水线模式）：最终结果插在它前面，临时结果保持在最后
+            cursor = QTextCursor(self.partial_start)
+            if cursor.atStart():
+                cursor.insertText(text, QTextCharFormat()); cursor.insertBlock()
+                self.partial_start.setPosition(cursor.position() - 1)  # 换行归入临时结果，清除后不留空行
+            else:
+                cursor.insertBlock(); cursor.insertText(text, QTextCharFormat())
+        self.text_edit.verticalScrollBar().setValue(self.text_edit.verticalScrollBar().maximum())
+    
+    def on_partial_text(self, text, utterance):
+        """在文本末尾以灰色显示第 utterance 句话的临时结果；文本为空表示这句话已结束"""
+        if not text:
+            # 最终结果替换同一句话的临时结果；后一句话已显示的临时结果保留
+            if utterance == self.partial_utterance: self.clear_partial_text()
+            return
+        self.clear_partial_text()
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.End)
+        start = cursor.position()
+        if not self.text_edit.document().isEmpty(): cursor.insertBlock()
+        partial_format = QTextCharFormat()
+        partial_format.setForeground(QColor(TColors.TEXT_TERTIARY))
+        cursor.insertText(text, partial_format)
+        self.partial_start = QTextCursor(self.text_edit.document())
+        self.partial_start.setPosition(start)
+        self.partial_end = QTextCursor(cursor)
+        self.partial_end.setKeepPositionOnInsert(True)  # 在临时结果后面输入的文字不算进临时结果
+        self.partial_utterance = utterance
+        self.update_char_count()
         self.text_edit.verticalScrollBar().setValue(self.text_edit.verticalScrollBar().maximum())
     
+    def clear_partial_text(self):
+        if self.partial_start is None: return
+        cursor = QTextCursor(self.partial_start)
+        cursor.setPosition(self.partial_end.position(), QTextCursor.KeepAnchor)
+        self.partial_start = self.partial_end = self.partial_utterance = None
+        cursor.removeSelectedText()
+        cursor.setCharFormat(QTextCharFormat())
+    
     def on_status_changed(self, status, status_type="info"): 
         """更新引擎状态指示灯和文本区域提示"""
         self.engine_selector.set_status(status_type)
@@ -638,17 +694,46 @@ class SpeechAppUI(QMainWindow):
             self.text_edit.setPlaceholderText("🔄 正在识别中，请稍等...")
         elif status_type == "error":
             self.text_edit.setPlaceholderText("⚠️ 识别失败，请重试")
+        elif status_type == "warning" and "预热" in status:
+            self.text_edit.setPlaceholderText("⏳ 语音引擎正在预热，请稍候...")
         elif status_type == "success" and "已就绪" in status:
             self.text_edit.setPlaceholderText("✨ 点击麦克风开始识别")
         else:
             self.text_edit.setPlaceholderText("点击麦克风开始识别")
         
     def on_recording_stopped(self):
+        self.clear_partial_text()  # 停止时未说完的一句没有最终结果
         if self.record_button.is_recording: 
             self.record_button.set_recording(False)
             self.text_edit.setPlaceholderText("✨ 点击麦克风开始识别")
             self.on_status_changed("已停止", "info")
 
+def load_engine_class(path):
+    """按 "模块.类名" 导入引擎类"""
+    module_name, class_name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+class EngineLoader(QObject):
+    """在后台线程中导入并创建识别引擎（枚举设备、打开麦克风、校准），创建完成后通过信号回到UI线程"""
+    loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def load(self, generation, engine_class):
+        thread = threading.Thread(target=self._run, args=(generation, engine_class), daemon=True)
+        thread.start()
+
+    def _run(self, generation, engine_class):
+        try:
+            if isinstance(engine_class, str):
+                engine_class = load_engine_class(engine_class)
+            recognizer = engine_class()
+            # 引擎对象在本线程创建，移交给主线程，避免线程结束后对象失去所属线程
+            recognizer.moveToThread(QCoreApplication.instance().thread())
+        except Exception as e:
+            self.failed.emit(generation, str(e))
+            return
+        self.loaded.emit(generation, recognizer)
+
 class MainController:
     """主控制器，连接UI和后端逻辑"""
     def __init__(self, app):
@@ -657,10 +742,19 @@ class MainController:
         self.ui = SpeechAppUI()
         self.speech_recognizer = None
         self.is_recording = False
+        self.start_when_ready = False  # 预热期间按下录音时，引擎就绪后自动开始
+        self.engine_loading = False    # 是否有引擎正在后台加载
+        self.engine_error = None       # 最近一次引擎加载失败的原因
+        
+        # 引擎在后台创建；generation 用于丢弃已被再次切换掉的引擎
+        self.engine_generation = 0
+        self.engine_loader = EngineLoader()
+        self.engine_loader.loaded.connect(self._on_engine_loaded)
+        self.engine_loader.failed.connect(self._on_engine_failed)
         
         self.engines = {
-            'baidu': {'name': '百度语音', 'class': BaiduSpeechSimple},
-            'google': {'name': 'Google语音', 'class': SpeechRecognizer},
+            'baidu': {'name': '百度语音', 'class': 'baidu_speech_simple.BaiduSpeechSimple'},
+            'google': {'name': 'Google语音', 'class': 'speech_recognizer.SpeechRecognizer'},
         }
         
         self.ui.set_engine_list(self.engines)
@@ -678,6 +772,7 @@ class MainController:
     def _connect_recognizer_signals(self):
         if self.speech_recognizer:
             self.speech_recognizer.text_recognized.connect(self.ui.on_text_recognized)
+            self.speech_recognizer.partial_text.connect(self.ui.on_partial_text)
             self.speech_recognizer.status_changed.connect(self.ui.on_status_changed)
             self.speech_recognizer.error_occurred.connect(self.handle_recognition_error)
 
@@ -689,14 +784,41 @@ class MainController:
     def change_engine(self, engine_key):
         if self.is_recording: self.stop_listening()
         if engine_config := self.engines.get(engine_key):
-            try: self.speech_recognizer = engine_config['class'](); self._connect_recognizer_signals(); self.ui.on_status_changed(f"{engine_config['name']} 已就绪", "success")
-            except Exception as e: self.ui.on_status_changed(f"引擎加载失败: {e}", "error")
+            # 不阻塞UI线程：引擎在后台预热，完成后由 _on_engine_loaded 接管
+            self.engine_generation += 1
+            self.speech_recognizer = None
+            self.engine_loading = True; self.engine_error = None
+            self.ui.on_status_changed(f"{engine_config['name']} 正在预热...", "warning")
+            self.engine_loader.load(self.engine_generation, engine_config['class'])
+
+    def _on_engine_loaded(self, generation, recognizer):
+        if generation != self.engine_generation: return  # 加载期间已切换到其他引擎
+        self.engine_loading = False
+        self.speech_recognizer = recognizer; self._connect_recognizer_signals()
+        engine_config = self.engines.get(self.ui.engine_selector.current_data(), {})
+        self.ui.on_status_changed(f"{engine_config.get('name', '语音引擎')} 已就绪", "success")
+        if self.start_when_ready: self.start_when_ready = False; self.start_listening()
+
+    def _on_engine_failed(self, generation, error):
+        if generation != self.engine_generation: return
+        self.engine_loading = False; self.engine_error = error
+        self.start_when_ready = False
+        self.ui.on_recording_stopped()
+        self.ui.on_status_changed(f"引擎加载失败: {error}", "error")
 
     def start_listening(self):
-        if self.speech_recognizer and not self.is_recording: self.is_recording = True; self.ui.on_status_changed("正在录音...", "warning"); self.speech_recognizer.start_listening()
+        if self.speech_recognizer is None:
+            if self.engine_loading: self.start_when_ready = True; return  # 仍在预热，就绪后自动开始
+            # 引擎加载失败：不等待，恢复录音按钮并提示
+            self.ui.on_recording_stopped()
+            self.ui.on_status_changed(f"引擎加载失败: {self.engine_error or '没有可用的识别引擎'}，请重新选择引擎", "error")
+            return
+        if not self.is_recording: self.is_recording = True; self.ui.on_status_changed("正在录音...", "warning"); self.speech_recognizer.start_listening()
             
     def stop_listening(self):
-        if self.speech_recognizer and self.is_recording: self.is_recording = False; self.speech_recognizer.stop_listening(); self.ui.on_recording_stopped()
+        self.start_when_ready = False
+        if self.speech_recognizer is None: self.ui.on_recording_stopped(); return
+        if self.is_recording: self.is_recording = False; self.speech_recognizer.stop_listening(); self.ui.on_recording_stopped()
 
     def show(self):
         self.ui.show()
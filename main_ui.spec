@@ -3,13 +3,23 @@
 
 block_cipher = None
 
+# 识别引擎由 main_ui.load_engine_class 按字符串动态导入，PyInstaller 分析不到，需逐一列出
+engine_imports = [
+    'speech_recognizer', 'baidu_speech_simple',
+    'recognizer_core', 'recognition_engines', 'recognition_pipeline',
+    'audio_capture', 'audio_sources', 'cancellation', 'segmenter', 'ring_buffer',
+    'noise_calibration', 'microphone_probe', 'engine_dispatch', 'engine_health',
+    'retry_policy', 'result_cache', 'baidu_client', 'flac_encoder',
+    'speech_recognition', 'pyaudio', 'numpy',
+]
+
 
 a = Analysis(
     ['main_ui.py'],
     pathex=[],
     binaries=[],
-    datas=[('FontAwesome.ttf', '.'), ('icons_rc.py', '.')],
-    hiddenimports=['ipaddress', 'PyQt5.sip', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets'],
+    datas=[('icons.rcc', '.')],
+    hiddenimports=['ipaddress', 'PyQt5.sip', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets'] + engine_imports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,156 @@
+"""
+麦克风并行探测
+默认麦克风不可用时，原来的做法是逐个打开设备并校准 0.5 秒，虚拟音频设备很多的机器上要等很久。
+这里同时探测所有输入设备（打开设备并读取一块数据），每个设备有单独的超时：
+- wait_first() 在第一个可用的真实麦克风探测成功后立即返回，其余设备继续在后台探测
+- ranked() 返回全部探测结果，按可用性、是否为虚拟设备、设备名和响应速度排序
+
+探测线程是守护线程，卡死的驱动不会阻止程序退出，也不会拖住其他设备的探测。
+PortAudio 的初始化和释放不是线程安全的，经过 audio_sources 的 init_portaudio / terminate_portaudio 逐个进行；
+打开、读取和关闭流在各探测线程中并发。
+"""
+import collections
+import threading
+import time
+
+import speech_recognition as sr
+
+from audio_sources import DeviceAudioSource, init_portaudio, terminate_portaudio
+
+# 设备名中包含这些词的优先（小写匹配）
+_PREFERRED_WORDS = ("microphone", "mic", "headset", "麦克风", "耳机")
+# 系统映射器、立体声混音、虚拟声卡等不是真正的麦克风
+_VIRTUAL_WORDS = ("mapper", "stereo mix", "primary sound capture", "loopback", "virtual", "cable",
+                  "映射器", "立体声混音", "主声音捕获")
+
+ProbeResult = collections.namedtuple("ProbeResult", "index name ok latency error")
+
+
+def list_input_devices():
+    """返回 [(设备索引, 设备名), ...]，只包含有输入通道的设备"""
+    try:
+        pyaudio_module = sr.Microphone.get_pyaudio()
+        audio = init_portaudio(pyaudio_module)
+    except Exception:
+        return list(enumerate(sr.Microphone.list_microphone_names()))
+    try:
+        devices = []
+        for index in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) > 0:
+                devices.append((index, info.get("name")))
+        return devices
+    finally:
+        terminate_portaudio(audio)
+
+
+def is_virtual(name):
+    name = (name or "").lower()
+    return any(word in name for word in _VIRTUAL_WORDS)
+
+
+def rank_key(result):
+    """排序键：可用 > 非虚拟设备 > 名称像麦克风 > 响应快"""
+    name = (result.name or "").lower()
+    is_preferred = any(word in name for word in _PREFERRED_WORDS)
+    return (not result.ok, is_virtual(name), not is_preferred, result.latency)
+
+
+class MicrophoneProber:
+    """并行探测麦克风设备"""
+
+    def __init__(self, timeout=2.0, microphone_factory=None):
+        """
+        timeout: 每个设备的探测超时（秒），超时的设备视为不可用
+        microphone_factory: 根据设备索引创建麦克风对象，默认 sr.Microphone
+        """
+        self.timeout = timeout
+        self.microphone_factory = microphone_factory or (lambda index: DeviceAudioSource(device_index=index))
+        self._results = {}
+        self._devices = []
+        self._condition = threading.Condition()
+        self._started_at = None
+        self._opened_at = {}  # 设备索引 -> 开始打开设备的时间，超时从这时起算
+
+    def start(self, devices=None):
+        """开始探测；devices 为 [(设备索引, 设备名), ...]，默认为全部输入设备"""
+        self._devices = list(devices) if devices is not None else list_input_devices()
+        self._started_at = time.monotonic()
+        for index, name in self._devices:
+            thread = threading.Thread(target=self._probe, args=(index, name), daemon=True)
+            thread.start()
+        return self
+
+    def _probe(self, index, name):
+        source = None
+        start = time.perf_counter()
+        try:
+            microphone = self.microphone_factory(index)
+            with self._condition:
+                self._opened_at[index] = time.monotonic()
+            start = time.perf_counter()
+            source = microphone.__enter__()
+            data = source.stream.read(source.CHUNK)
+            ok, error = bool(data), None if data else "没有音频数据"
+        except Exception as e:
+            ok, error = False, str(e)
+        # 先记录结果再关闭设备，关闭慢的驱动不会推迟结果
+        self._record(ProbeResult(index, name, ok, time.perf_counter() - start, error))
+        if source is not None:
+            try:
+                source.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def _record(self, result):
+        with self._condition:
+            if time.monotonic() > self._device_deadline(result.index):
+                # 已按超时处理的设备，迟到的结果不再采用
+                result = result._replace(ok=False, error="探测超时")
+            self._results[result.index] = result
+            self._condition.notify_all()
+
+    def _device_deadline(self, index):
+        """设备的探测截止时间：从开始打开这个设备起算；还没开始打开的（如在等待 PortAudio 初始化）从探测开始起算"""
+        return self._opened_at.get(index, self._started_at) + self.timeout
+
+    def _next_deadline(self):
+        """尚未出结果的设备中最近的截止时间；全部设备都已有结果或已超时时返回 None"""
+        now = time.monotonic()
+        deadlines = [self._device_deadline(index) for index, _ in self._devices if index not in self._results]
+        deadlines = [deadline for deadline in deadlines if deadline > now]
+        return min(deadlines) if deadlines else None
+
+    def _finished(self):
+        return self._next_deadline() is None
+
+    def _wait(self):
+        deadline = self._next_deadline()
+        if deadline is not None:
+            self._condition.wait(max(0.0, deadline - time.monotonic()))
+
+    def wait_first(self):
+        """
+        等待第一个可用的真实设备，返回其 ProbeResult。
+        只有虚拟设备可用时等到探测结束再取其中最好的；全部失败或超时时返回 None
+        """
+        with self._condition:
+            while True:
+                working = [r for r in self._results.values() if r.ok]
+                real = [r for r in working if not is_virtual(r.name)]
+                if real:
+                    return min(real, key=rank_key)
+                if self._finished():
+                    return min(working, key=rank_key) if working else None
+                self._wait()
+
+    def ranked(self, wait=True):
+        """返回排序后的全部探测结果；wait 为 True 时等待所有设备探测完成或超时"""
+        with self._condition:
+            while wait and not self._finished():
+                self._wait()
+            results = dict(self._results)
+        for index, name in self._devices:
+            if index not in results:
+                results[index] = ProbeResult(index, name, False, self.timeout, "探测超时")
+        return sorted(results.values(), key=rank_key)
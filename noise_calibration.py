@@ -0,0 +1,140 @@
+"""
+麦克风噪声校准缓存
+adjust_for_ambient_noise 每次都要阻塞录音 0.5 秒。这里把每个设备校准后的能量阈值保存到磁盘，
+以"设备名 + 宿主 API"为键（同一个麦克风在 MME / WASAPI 下是不同的设备）：
+- 有缓存时直接使用，只打开一下设备确认可用
+- 没有缓存时照常校准一次并保存（与 adjust_for_ambient_noise 相同的算法，能量用分段器的
+  frame_energies 计算，不依赖 Python 3.13 已移除的 audioop）
+- 实际录音开始后，由分段器自适应得到的阈值再写回缓存，逐步修正
+
+缓存文件默认位于 ~/.recordMytalk/noise_calibration.json，可用环境变量
+RECORDMYTALK_CALIBRATION 指定其他路径。
+"""
+import json
+import os
+import threading
+import time
+
+from audio_sources import init_portaudio, terminate_portaudio
+from segmenter import frame_energies
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".recordMytalk", "noise_calibration.json")
+CALIBRATION_SECONDS = 0.5
+REFINE_WEIGHT = 0.5  # 新测得的阈值所占的权重
+
+
+def device_key(microphone):
+    """返回麦克风的缓存键 "设备名|宿主 API"；无法获取设备信息时返回 None"""
+    pyaudio_module = getattr(microphone, "pyaudio_module", None)
+    if pyaudio_module is None:
+        return None
+    audio = init_portaudio(pyaudio_module)
+    try:
+        if microphone.device_index is None:
+            info = audio.get_default_input_device_info()
+        else:
+            info = audio.get_device_info_by_index(microphone.device_index)
+        host_api = audio.get_host_api_info_by_index(info["hostApi"])["name"]
+        return f"{info['name']}|{host_api}"
+    except Exception:
+        return None
+    finally:
+        terminate_portaudio(audio)
+
+
+class NoiseCalibrationStore:
+    """按设备保存能量阈值的 JSON 文件（线程安全）"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("RECORDMYTALK_CALIBRATION") or DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get(self, key):
+        """返回缓存的能量阈值，没有时返回 None"""
+        if not key:
+            return None
+        with self._lock:
+            entry = self._load().get(key)
+        return entry.get("energy_threshold") if entry else None
+
+    def put(self, key, threshold):
+        """直接保存（用于完整校准的结果）"""
+        if not key:
+            return
+        with self._lock:
+            self._load()[key] = {"energy_threshold": float(threshold), "updated": time.time()}
+            try:
+                self._save()
+            except OSError as e:
+                print(f"噪声校准缓存写入失败: {e}")
+
+    def refine(self, key, threshold):
+        """与已有的值加权平均后保存（用于录音过程中的自适应结果）"""
+        previous = self.get(key)
+        if previous is not None:
+            threshold = previous * (1 - REFINE_WEIGHT) + threshold * REFINE_WEIGHT
+        self.put(key, threshold)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_default_store():
+    """进程内共享的缓存（切换引擎时无需重新读取文件）"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = NoiseCalibrationStore()
+        return _default_store
+
+
+def measure_ambient_noise(recognizer, source, duration=CALIBRATION_SECONDS):
+    """
+    读取 duration 秒背景噪声，按 adjust_for_ambient_noise 的方式更新 recognizer.energy_threshold：
+    每块的 RMS 能量乘以 dynamic_energy_ratio 作为目标值，按 dynamic_energy_adjustment_damping 加权平均
+    """
+    seconds_per_buffer = source.CHUNK / float(source.SAMPLE_RATE)
+    chunks = max(1, int(duration / seconds_per_buffer))
+    data = b"".join(source.stream.read(source.CHUNK) for _ in range(chunks))
+    damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_buffer
+    for energy in frame_energies(data, source.SAMPLE_WIDTH, source.CHUNK * source.SAMPLE_WIDTH):
+        target = energy * recognizer.dynamic_energy_ratio
+        recognizer.energy_threshold = recognizer.energy_threshold * damping + target * (1 - damping)
+
+
+def calibrate(recognizer, microphone, store=None):
+    """
+    为 recognizer 设置 microphone 的能量阈值，返回缓存键。
+    有缓存时只打开设备确认可用；否则校准 CALIBRATION_SECONDS 秒并写入缓存。
+    设备无法打开时抛出异常。
+    """
+    store = store or get_default_store()
+    key = device_key(microphone)
+    cached = store.get(key)
+    with microphone as source:
+        if cached is not None:
+            recognizer.energy_threshold = cached
+            return key
+        measure_ambient_noise(recognizer, source)
+    store.put(key, recognizer.energy_threshold)
+    return key
@@ -0,0 +1,81 @@
+"""
+识别引擎
+每个引擎是一个策略对象，识别后端按优先级组合若干引擎（见 recognizer_core）：
+- name 用于调度、健康统计和结果缓存键
+- recognize(audio) 返回识别文本；未识别到语音时抛出 sr.UnknownValueError，
+  其他错误统一抛出带引擎名称的 sr.RequestError（保留原始异常链，重试策略据此判断错误类型）
+- timeout 为 (连接超时, 读取超时) 秒数；传入共享的 timeouts 字典时按引擎名查找，修改后下一次请求即生效
+"""
+import speech_recognition as sr
+
+import baidu_client
+from flac_encoder import FlacAudioData
+
+
+class RecognitionEngine:
+    """识别引擎基类"""
+
+    name = None
+    description = ""
+
+    def __init__(self, timeout=(3.0, 8.0), timeouts=None):
+        """
+        timeout: (连接超时, 读取超时) 秒数
+        timeouts: 可选的 {引擎名: (连接超时, 读取超时)} 字典（如识别后端的 engine_timeouts），其中有本引擎时优先使用
+        """
+        self._timeout = timeout
+        self.timeouts = timeouts
+
+    @property
+    def timeout(self):
+        if self.timeouts and self.name in self.timeouts:
+            return self.timeouts[self.name]
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+
+    def recognize(self, audio):
+        try:
+            return self._recognize(audio)
+        except sr.UnknownValueError:
+            raise
+        except Exception as e:
+            raise sr.RequestError(f"{self.description}失败: {e}") from e
+
+    def _recognize(self, audio):
+        raise NotImplementedError
+
+
+class GoogleEngine(RecognitionEngine):
+    """Google 语音识别（SpeechRecognition 自带的免费接口）"""
+
+    name = "Google"
+    description = "Google识别"
+
+    def __init__(self, recognizer, language="zh-CN", timeout=(3.0, 8.0), timeouts=None):
+        super().__init__(timeout, timeouts)
+        self.recognizer = recognizer
+        self.language = language
+
+    def _recognize(self, audio):
+        # urllib 的超时同时作用于建立连接和读取响应，取两者中较大的值
+        timeout = self.timeout
+        self.recognizer.operation_timeout = max(timeout) if isinstance(timeout, (tuple, list)) else timeout
+        # Windows 上（或找不到外部 flac 程序时）使用进程内 FLAC 编码（见 flac_encoder）
+        return self.recognizer.recognize_google(FlacAudioData.from_audio(audio), language=self.language)
+
+
+class BaiduEngine(RecognitionEngine):
+    """百度短语音识别（直接调用 REST 接口，token 和连接在进程内复用）"""
+
+    name = "Baidu"
+    description = "百度识别"
+
+    def _recognize(self, audio):
+        # 需要百度智能云的 API Key / Secret Key（环境变量 BAIDU_API_KEY / BAIDU_SECRET_KEY）
+        client = baidu_client.get_default_client()
+        if client is None:
+            raise sr.RequestError("未配置百度 API Key（环境变量 BAIDU_API_KEY / BAIDU_SECRET_KEY）")
+        return client.recognize(audio, timeout=self.timeout)
@@ -0,0 +1,394 @@
+"""
+识别流水线模块
+将"采集"和"识别"拆成两个阶段：监听线程只负责不断录制语音片段并放入有界队列，
+识别线程从队列中取出片段调用识别引擎。这样网络往返期间说的话不会丢失，
+识别结果仍按录制顺序回调。
+SplitRecognizer 把长语音在停顿处切成几段并行识别，再按顺序拼接成一句。
+PartialRecognizer 在说话过程中定期识别正在增长的语音，给出临时结果。
+SpeculativeRecognizer 在短暂停顿时提前识别，这句话确实结束时直接采用提前得到的结果。
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+
+from cancellation import CancellationToken
+from segmenter import split_points
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionPipeline:
+    """采集/识别流水线"""
+
+    def __init__(self, recognize, on_result, on_error=None, on_start=None,
+                 max_pending=4, workers=1, cancel_token=None):
+        """
+        recognize: 识别函数 recognize(audio) -> str，可抛出异常
+        on_result: 结果回调 on_result(text, context)，按提交顺序调用
+        on_error: 错误回调 on_error(exception, context)，同样按提交顺序调用
+        on_start: 某个片段开始识别时的回调 on_start(context)
+        max_pending: 队列中最多等待识别的片段数，队列满时 submit 会阻塞
+        workers: 并行识别线程数
+        cancel_token: cancellation.CancellationToken，取消后不再接收片段，也不再回调任何结果
+        """
+        self._recognize = recognize
+        self._on_result = on_result
+        self._on_error = on_error
+        self._on_start = on_start
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._workers = []
+        self._worker_count = max(1, workers)
+
+        # 结果重排序：识别可能乱序完成，按序号依次回调
+        self._next_seq = 0
+        self._next_deliver = 0
+        self._finished = {}
+        self._deliver_lock = threading.Lock()
+        self._closed = False
+        self._cancel_token = cancel_token
+
+    def _cancelled(self):
+        return self._cancel_token is not None and self._cancel_token.is_cancelled
+
+    def start(self):
+        """启动识别线程"""
+        self._closed = False
+        for _ in range(self._worker_count):
+            worker = threading.Thread(target=self._worker_loop)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, audio, context=None, result=None):
+        """
+        提交一个语音片段，队列满时阻塞等待（背压）
+        result: 已在别处开始识别的 Future（如提前端点识别），识别线程直接等待其结果
+        返回 False 表示流水线已关闭，片段未被接收
+        """
+        if self._closed or self._cancelled():
+            return False
+        # 先分配序号再入队：识别很快时，入队后结果可能立即交付，pending() 不能出现负数
+        with self._deliver_lock:
+            seq = self._next_seq
+            self._next_seq += 1
+        while not self._closed and not self._cancelled():
+            try:
+                self._queue.put((seq, audio, context, result), timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        # 未能入队：占用的序号按"已跳过"处理，保证后续结果能继续交付，不回调
+        self._finish(seq, None, None, context, skip=True)
+        return False
+
+    def pending(self):
+        """尚未交付结果的片段数"""
+        return self._next_seq - self._next_deliver
+
+    def close(self, discard_pending=False, timeout=None):
+        """
+        关闭流水线
+        discard_pending: 为 True 时丢弃尚未开始识别的片段，否则等待它们识别完成
+        """
+        self._closed = True
+        if discard_pending:
+            self._discard_queued()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout=timeout)
+        self._workers = []
+
+    def _discard_queued(self):
+        """清空队列，被丢弃的片段按"无结果"交付，保证序号连续"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                if item[3] is not None:
+                    item[3].cancel()
+                self._finish(item[0], None, None, item[2])
+
+    def _worker_loop(self):
+        """识别线程主循环"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            seq, audio, context, result = item
+            if self._cancelled():
+                if result is not None:
+                    result.cancel()
+                self._finish(seq, None, None, context)
+                continue
+            if self._on_start:
+                self._on_start(context)
+            try:
+                text = result.result() if result is not None else self._recognize(audio)
+                self._finish(seq, text, None, context)
+            except Exception as e:
+                self._finish(seq, None, e, context)
+
+    def _finish(self, seq, text, error, context, skip=False):
+        """记录识别结果，并按序号交付所有已就绪的结果；skip 为 True 时该序号不回调"""
+        with self._deliver_lock:
+            self._finished[seq] = None if skip else (text, error, context)
+            while self._next_deliver in self._finished:
+                entry = self._finished.pop(self._next_deliver)
+                self._next_deliver += 1
+                if entry is None:
+                    continue
+                text, error, context = entry
+                if self._cancelled():
+                    # 已停止监听：结果直接丢弃
+                    continue
+                if error is not None:
+                    if self._on_error:
+                        self._on_error(error, context)
+                else:
+                    self._on_result(text, context)
+
+
+def join_texts(texts):
+    """按顺序拼接各段识别结果；中文直接相连，两侧都是英文字母或数字时加空格"""
+    result = ""
+    for text in texts:
+        if result and result[-1].isascii() and result[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+            result += " "
+        result += text
+    return result
+
+
+class SplitRecognizer:
+    """
+    长语音切分识别
+    超过 max_length 秒的语音在内部能量最低处切成若干段（见 segmenter.split_points），
+    各段并行识别后按顺序拼接；标点由调用方在拼接后的整句上添加
+    """
+
+    def __init__(self, recognize, max_length=10.0, min_length=None, workers=4, benign_errors=()):
+        """
+        recognize: 识别一段语音的函数 recognize(audio, cancel_token=None) -> str
+        max_length: 每段的最长秒数，0 表示不切分
+        min_length: 每段的最短秒数，默认为 max_length 的一半
+        workers: 并行识别的段数
+        benign_errors: 某一段出现时直接忽略的异常类型（如"未识别到语音"）
+        """
+        self._recognize = recognize
+        self.max_length = max_length
+        self.min_length = min_length
+        self.benign_errors = tuple(benign_errors)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="split")
+
+    def split(self, audio):
+        """返回切分后的 sr.AudioData 列表；不需要切分时只包含原语音"""
+        if not self.max_length:
+            return [audio]
+        data = audio.frame_data
+        points = split_points(data, audio.sample_rate, audio.sample_width, self.max_length, self.min_length)
+        bounds = [0] + points + [len(data)]
+        return [sr.AudioData(data[start:end], audio.sample_rate, audio.sample_width)
+                for start, end in zip(bounds, bounds[1:])]
+
+    def recognize(self, audio, cancel_token=None):
+        """
+        识别一段语音；长语音切分后并行识别，返回拼接后的文本
+        cancel_token: 传给各段的识别函数，None 时由识别函数使用默认的令牌
+        """
+        pieces = self.split(audio)
+        if len(pieces) == 1:
+            return self._recognize(audio, cancel_token=cancel_token)
+
+        futures = [self._executor.submit(self._recognize, piece, cancel_token=cancel_token) for piece in pieces]
+        texts = []
+        benign = None
+        errors = []
+        for future in futures:
+            try:
+                text = future.result()
+            except self.benign_errors as e:
+                benign = e
+                continue
+            except Exception as e:
+                errors.append(e)
+                continue
+            if text:
+                texts.append(text)
+
+        if not texts:
+            if errors:
+                raise errors[0]
+            raise benign or sr.UnknownValueError()
+        if errors:
+            # 部分片段失败时保留其余片段的文本，不整句丢弃
+            logger.debug("长语音 %d 段中有 %d 段识别失败: %s", len(pieces), len(errors), errors[0])
+        return join_texts(texts)
+
+    def shutdown(self):
+        """关闭线程池，不等待仍在进行的识别"""
+        self._executor.shutdown(wait=False)
+
+
+class PartialRecognizer:
+    """
+    临时结果识别
+    说话过程中定期提交目前为止的语音，后台线程识别后回调临时文本。
+    只保留最新的请求：上一次识别还没返回时，新提交的语音替换等待中的那一个；
+    一句话结束（finish_utterance）后，这句话迟到的临时结果直接丢弃，由最终结果替换。
+    每句话按结束顺序从 0 开始编号，临时结果带上所属句子的序号，
+    界面据此只在同一句话的最终结果到达时清除它的临时结果。
+    """
+
+    def __init__(self, recognize, on_partial):
+        """
+        recognize: 识别函数 recognize(audio) -> str
+        on_partial: 临时结果回调 on_partial(text, utterance)，utterance 为句子序号
+        """
+        self._recognize = recognize
+        self._on_partial = on_partial
+        self._cond = threading.Condition()
+        self._pending = None
+        self._utterance = 0
+        self._closed = False
+        self._worker = None
+
+    def start(self):
+        """启动识别线程"""
+        self._closed = False
+        self._worker = threading.Thread(target=self._worker_loop)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def submit(self, audio):
+        """提交当前这句话目前为止的语音"""
+        with self._cond:
+            self._pending = (self._utterance, audio)
+            self._cond.notify()
+
+    def finish_utterance(self):
+        """当前这句话已结束，丢弃它尚未返回的临时结果；返回这句话的序号"""
+        with self._cond:
+            utterance = self._utterance
+            self._utterance += 1
+            self._pending = None
+            return utterance
+
+    def close(self):
+        """停止识别线程，不等待正在进行的识别"""
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+        self._worker = None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                utterance, audio = self._pending
+                self._pending = None
+            try:
+                text = self._recognize(audio)
+            except Exception:
+                # 临时结果失败不影响最终结果，忽略
+                continue
+            with self._cond:
+                # 在锁内回调：保证不会晚于 finish_utterance 之后的最终结果
+                if text and utterance == self._utterance and not self._closed:
+                    self._on_partial(text, utterance)
+
+
+class SpeculativeRecognizer:
+    """
+    提前端点识别
+    说话中出现短暂停顿（如 0.4 秒）时立即识别目前为止的语音，不等满 pause_threshold：
+    - 停顿后又开始说话：取消这次识别（通过它自己的取消令牌打断进行中的请求），计为未命中
+    - 这句话确实在此结束：直接采用提前识别的结果（commit），计为命中，省下等待停顿的时间
+    命中 / 未命中次数见 stats()，用于调整停顿阈值
+    """
+
+    def __init__(self, recognize, workers=2, cancel_token=None):
+        """
+        recognize: 识别函数 recognize(audio, cancel_token=None) -> str
+        workers: 同时进行的提前识别数
+        cancel_token: 会话的取消令牌；每次提前识别使用它的子令牌，作废时单独取消
+        """
+        self._recognize = recognize
+        self._cancel_token = cancel_token
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._speculation = None  # (Future, 提前识别的音频, 开始时间, 取消令牌)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0  # 命中时提前开始识别的总秒数
+
+    def speculate(self, audio):
+        """检测到短暂停顿：提前识别目前为止的语音"""
+        token = CancellationToken(parent=self._cancel_token)
+        future = self._executor.submit(self._recognize, audio, cancel_token=token)
+        future.add_done_callback(lambda _: token.detach())
+        with self._lock:
+            previous = self._speculation
+            self._speculation = (future, audio.frame_data, time.monotonic(), token)
+        if previous:
+            self._discard(previous)
+
+    def cancel(self):
+        """停顿后又开始说话：作废提前识别"""
+        with self._lock:
+            speculation, self._speculation = self._speculation, None
+        if speculation:
+            self._discard(speculation)
+
+    def commit(self, audio):
+        """
+        这句话已结束：若提前识别的正是这句话（最终片段与提前识别的音频只差尾部静音），
+        返回其 Future，否则返回 None
+        """
+        with self._lock:
+            speculation, self._speculation = self._speculation, None
+        if speculation is None:
+            return None
+        future, snapshot, started, _ = speculation
+        data = audio.frame_data
+        common = min(len(snapshot), len(data))
+        if not common or snapshot[:common] != data[:common]:
+            self._discard(speculation)
+            return None
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += time.monotonic() - started
+        return future
+
+    def _discard(self, speculation):
+        future, _, _, token = speculation
+        future.cancel()
+        # 已经开始的识别由令牌打断（对冲、重试都随之停止），不再占用线程池
+        token.cancel()
+        with self._lock:
+            self.misses += 1
+
+    def stats(self):
+        """命中次数、未命中次数、命中率和平均提前的秒数"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / float(total) if total else 0.0,
+                'avg_saved_seconds': self.saved_seconds / self.hits if self.hits else 0.0,
+            }
+
+    def shutdown(self):
+        """关闭线程池，不等待仍在进行的识别"""
+        self._executor.shutdown(wait=False)
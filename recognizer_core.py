@@ -0,0 +1,682 @@
+"""
+识别后端核心
+SpeechRecognizer（Google 优先）和 BaiduSpeechSimple（百度优先）共用的监听 / 识别流程：
+麦克风初始化与校准、采集服务、分段、识别流水线、临时结果、提前端点识别、
+结果缓存、重试与截止时间、取消，以及标点和错误提示。
+两个后端只是配置不同：引擎组合（见 recognition_engines）、标点规则和状态文字。
+
+监听会话的状态机：
+    idle ──→ calibrating ──→ idle              （初始化麦克风并校准噪声）
+    idle ──→ listening ⇄ recognizing           （开始监听；有语音正在识别时为 recognizing）
+    listening / recognizing ──→ stopping ──→ idle   （停止监听、音频源读完或长时间无语音）
+"""
+import logging
+import threading
+import time
+
+import speech_recognition as sr
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import noise_calibration
+import result_cache
+import retry_policy
+from audio_capture import AudioCaptureService
+from audio_sources import DeviceAudioSource
+from cancellation import CancellationToken, Cancelled
+from engine_dispatch import HedgedDispatcher, RecognitionTimeout
+from microphone_probe import MicrophoneProber
+from recognition_pipeline import RecognitionPipeline, SplitRecognizer, PartialRecognizer, SpeculativeRecognizer
+from segmenter import create_segmenter
+
+# 尝试导入 PyAudio，如果失败则设置标志
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+NETWORK_ERROR_MESSAGE = "网络连接问题，语音识别服务暂时不可用。\n\n建议：\n1. 检查网络连接\n2. 稍后再试\n3. 或尝试使用离线识别"
+
+
+class RecognizerCore(QObject):
+    """识别后端核心；子类通过 _create_engines 和 _sentence_end 配置引擎组合与标点规则"""
+
+    # 定义信号
+    text_recognized = pyqtSignal(str)  # 识别到文本时发出信号
+    error_occurred = pyqtSignal(str)   # 发生错误时发出信号
+    status_changed = pyqtSignal(str)   # 状态变化时发出信号
+    partial_text = pyqtSignal(str, int)  # 说话过程中的临时结果 (文本, 句子序号)；文本为空表示这句话已结束，清除它的临时结果
+    state_changed = pyqtSignal(str)    # 状态机的状态变化
+
+    IDLE = "idle"
+    CALIBRATING = "calibrating"
+    LISTENING = "listening"
+    RECOGNIZING = "recognizing"
+    STOPPING = "stopping"
+
+    # 允许的状态转换
+    _TRANSITIONS = {
+        IDLE: (CALIBRATING, LISTENING),
+        CALIBRATING: (IDLE,),
+        LISTENING: (RECOGNIZING, STOPPING),
+        RECOGNIZING: (LISTENING, STOPPING),
+        STOPPING: (IDLE,),
+    }
+
+    # 状态文字
+    listening_text = "正在监听..."
+    recognizing_text = "正在识别..."
+
+    # 疑问词：句中出现时以问号结尾
+    sentence_keywords = ["什么", "怎么", "为什么", "哪里", "谁", "吗", "呢"]
+
+    def __init__(self, audio_source=None):
+        """
+        audio_source: 可选的 audio_sources.AudioSource（如 FileAudioSource / SyntheticAudioSource），
+                      指定后不再初始化麦克风，监听时从该音频源读取
+        """
+        super().__init__()
+        self.recognizer = sr.Recognizer()
+        self.microphone = None
+        self.listen_thread = None
+        self.calibration_key = None  # 当前麦克风在噪声校准缓存中的键
+        self.probe_timeout = 2.0     # 默认麦克风不可用时，探测每个设备的超时秒数
+        self.microphone_prober = None
+        self.state = self.IDLE
+        self._state_lock = threading.Lock()
+
+        # 流水线模式：录音与识别并行进行，识别结果仍按说话顺序输出
+        self.pipeline_mode = True
+        self.max_pending_utterances = 4  # 等待识别的语音片段上限
+        self.recognition_workers = 2     # 并行识别线程数
+        self.pre_roll = 0.3              # 拼到每句话开头的预录音秒数，避免开头的字被截掉
+        self.partial_interval = 1.0      # 说话过程中每隔该秒数给出一次临时结果，0 表示关闭
+        self.speculative_pause = 0.4     # 停顿达到该秒数即提前识别，这句话确实结束时直接采用结果；0 表示关闭
+        self._language = 'zh-CN'
+        # 识别结果缓存（按音频指纹 + 引擎 + 语言），None 表示不使用
+        self.result_cache = result_cache.get_default_cache()
+        # 各引擎的 (连接超时, 读取超时) 秒数，引擎在每次请求时读取
+        self._engine_timeouts = {'Google': (3.0, 8.0), 'Baidu': (3.0, 8.0)}
+
+        # 调整识别器参数（需在校准之前，否则会覆盖校准得到的阈值）
+        self.recognizer.energy_threshold = 1000  # 噪声阈值
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 1.5  # 静音时间阈值
+
+        # 标点符号处理参数
+        self.last_text_time = 0
+        self.previous_text = ""
+
+        # 按优先级排列的识别引擎；首选引擎在对冲延迟内无结果时同时请求下一个，取先返回的结果
+        self.engines = self._create_engines()
+        self.recognition_engines = [
+            {'name': engine.name, 'method': engine.recognize, 'description': engine.description}
+            for engine in self.engines
+        ]
+        # 连续出错的引擎会被熔断跳过；"未识别到语音"不算引擎故障。
+        # 对冲延迟、重试策略和截止时间保存在调度器中，通过下面同名的属性修改，下一次识别即生效
+        self.dispatcher = HedgedDispatcher(
+            self.recognition_engines,
+            hedge_delay_ms=800,
+            benign_errors=(sr.UnknownValueError,),
+            retry_policy=retry_policy.get_default_policy(),
+            deadline=10.0)
+        # 超过 split_length 秒的长语音在停顿处切开并行识别
+        self.splitter = SplitRecognizer(
+            self._recognize_hedged,
+            max_length=10.0,
+            benign_errors=(sr.UnknownValueError,))
+        self.pipeline = None      # 当前监听会话的识别流水线
+        self.speculator = None    # 最近一次监听会话的提前端点识别器，命中 / 未命中统计见 stats()
+        self.cancel_token = None  # 当前监听会话的取消令牌，停止监听时取消
+
+        # 检查 PyAudio 是否可用（使用文件或合成音频源时不需要）
+        if audio_source is None and not PYAUDIO_AVAILABLE:
+            self.error_occurred.emit("PyAudio 未安装！请运行 install_pyaudio.bat 安装 PyAudio")
+            return
+
+        if audio_source is not None:
+            self.microphone = audio_source
+        else:
+            self._transition(self.CALIBRATING)
+            try:
+                self._initialize_microphone()
+            finally:
+                self._transition(self.IDLE)
+
+    def _create_engines(self):
+        """按优先级返回识别引擎（recognition_engines.RecognitionEngine）列表，由子类配置"""
+        raise NotImplementedError
+
+    # ---- 识别参数（转发给调度器、切分器和引擎，修改后下一次识别即生效） ----
+
+    @property
+    def hedge_delay_ms(self):
+        """首选引擎多少毫秒无结果后同时请求下一个引擎"""
+        return self.dispatcher.hedge_delay_ms
+
+    @hedge_delay_ms.setter
+    def hedge_delay_ms(self, value):
+        self.dispatcher.hedge_delay_ms = value
+
+    @property
+    def utterance_deadline(self):
+        """每句话识别的截止秒数（含对冲和重试），到时仍无结果即放弃这句话；None 表示不限制"""
+        return self.dispatcher.deadline
+
+    @utterance_deadline.setter
+    def utterance_deadline(self, value):
+        self.dispatcher.deadline = value
+
+    @property
+    def retry_policy(self):
+        """识别请求出错时的重试策略（所有引擎共用），None 表示不重试"""
+        return self.dispatcher.retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, value):
+        self.dispatcher.retry_policy = value
+
+    @property
+    def split_length(self):
+        """超过该秒数的长语音在停顿处切开并行识别，0 表示不切分"""
+        return self.splitter.max_length
+
+    @split_length.setter
+    def split_length(self, value):
+        self.splitter.max_length = value
+
+    @property
+    def engine_timeouts(self):
+        """各引擎的 (连接超时, 读取超时) 秒数；可整体替换，也可修改其中一项"""
+        return self._engine_timeouts
+
+    @engine_timeouts.setter
+    def engine_timeouts(self, value):
+        self._engine_timeouts = value
+        for engine in self.engines:
+            engine.timeouts = value
+
+    @property
+    def language(self):
+        """识别语言"""
+        return self._language
+
+    @language.setter
+    def language(self, value):
+        self._language = value
+        for engine in self.engines:
+            if hasattr(engine, 'language'):
+                engine.language = value
+
+    # ---- 状态机 ----
+
+    @property
+    def is_listening(self):
+        """监听会话是否仍在进行（listening 或 recognizing）"""
+        return self.state in (self.LISTENING, self.RECOGNIZING)
+
+    def _transition(self, state, expected=None):
+        """
+        转换到 state；不允许的转换（或当前状态不是 expected）时不做任何事，返回 False
+        """
+        with self._state_lock:
+            if expected is not None and self.state != expected:
+                return False
+            if state not in self._TRANSITIONS[self.state]:
+                return False
+            self.state = state
+        self.state_changed.emit(state)
+        return True
+
+    # ---- 麦克风 ----
+
+    def _handle_microphone_error(self, e1, e2, e3):
+        """处理麦克风设备错误"""
+        error_msg = "无法找到可用的麦克风设备！\n\n"
+
+        # 检查错误类型，给出具体建议
+        if "No Default Input Device Available" in str(e1):
+            error_msg += "请检查以下设置：\n\n"
+            error_msg += "1. 确保麦克风已正确连接到电脑\n"
+            error_msg += "2. 检查系统声音设置：\n"
+            error_msg += "   - 右键点击任务栏音量图标\n"
+            error_msg += "   - 选择'声音设置'\n"
+            error_msg += "   - 确保输入设备已启用\n\n"
+            error_msg += "3. 如果使用蓝牙耳机：\n"
+            error_msg += "   - 确保蓝牙已连接\n"
+            error_msg += "   - 重新连接蓝牙设备\n\n"
+            error_msg += "4. 重启程序或重新插拔麦克风"
+        else:
+            error_msg += f"详细错误信息：\n"
+            error_msg += f"• 默认设备: {str(e1)}\n"
+            error_msg += f"• 内置麦克风: {str(e2)}\n"
+            error_msg += f"• 系统映射器: {str(e3)}"
+
+        self.error_occurred.emit(error_msg)
+
+    def _initialize_microphone(self):
+        """初始化麦克风，并提供设备列表"""
+        try:
+            mic_list = sr.Microphone.list_microphone_names()
+            if not mic_list:
+                self.error_occurred.emit("未检测到任何麦克风设备！")
+                self.microphone = None
+                return
+
+            # 尝试使用默认麦克风
+            try:
+                self.microphone = DeviceAudioSource()
+                # 有校准缓存时不再阻塞校准
+                self.calibration_key = noise_calibration.calibrate(self.recognizer, self.microphone)
+                self.status_changed.emit("默认麦克风已就绪")
+                return
+            except Exception as e:
+                print(f"默认麦克风失败: {e}。尝试其他设备...")
+
+            # 如果默认失败，并行探测所有输入设备，第一个可用的设备立即投入使用
+            # （其余设备继续在后台探测，完整的排序结果见 self.microphone_prober.ranked()）
+            self.microphone_prober = MicrophoneProber(timeout=self.probe_timeout).start()
+            first = self.microphone_prober.wait_first()
+            if first and self._use_microphone(first):
+                return
+            for result in self.microphone_prober.ranked():
+                if result.ok and (first is None or result.index != first.index) and self._use_microphone(result):
+                    return
+
+            # 如果所有设备都失败了
+            self.error_occurred.emit("所有麦克风设备均初始化失败。")
+            self.microphone = None
+
+        except Exception as e:
+            self.error_occurred.emit(f"麦克风初始化过程中发生未知错误: {str(e)}")
+            self.microphone = None
+
+    def _use_microphone(self, result):
+        """使用探测成功的设备并校准；失败时返回 False"""
+        try:
+            self.microphone = DeviceAudioSource(device_index=result.index)
+            self.calibration_key = noise_calibration.calibrate(self.recognizer, self.microphone)
+        except Exception:
+            return False
+        self.status_changed.emit(f"使用麦克风: {result.name}")
+        return True
+
+    def check_microphone_status(self, probe=True):
+        """检查麦克风状态；probe 为 False 时不实际打开设备"""
+        if self.microphone is None:
+            if not PYAUDIO_AVAILABLE:
+                return False, "PyAudio 未安装"
+            return False, "麦克风设备未初始化"
+        if not probe:
+            return True, "麦克风已初始化"
+
+        # 尝试测试麦克风是否真的可用
+        try:
+            with self.microphone as source:
+                # 简单测试，不实际录音
+                pass
+            return True, "麦克风正常"
+        except Exception as e:
+            return False, f"麦克风连接异常: {str(e)}"
+
+    def _refine_calibration(self, threshold):
+        """把录音中自适应得到的阈值写回校准缓存"""
+        if self.calibration_key:
+            noise_calibration.get_default_store().refine(self.calibration_key, threshold)
+
+    # ---- 识别 ----
+
+    def _recognize_audio(self, audio):
+        """识别一段语音：先查结果缓存，未命中时再请求识别引擎"""
+        if self.result_cache is None:
+            return self._recognize_split(audio)
+        engines = "+".join(engine['name'] for engine in self.recognition_engines)
+        return self.result_cache.recognize(self._recognize_split, audio, engines, self.language)
+
+    def _recognize_split(self, audio, cancel_token=None):
+        """长语音在停顿处切开并行识别，拼接后返回（不查缓存，临时结果和提前识别直接使用）"""
+        return self.splitter.recognize(audio, cancel_token=cancel_token)
+
+    def _recognize_hedged(self, audio, cancel_token=None):
+        """
+        同时向多个识别引擎发起对冲请求，返回最先得到的有效结果
+        cancel_token: 默认为会话的取消令牌；提前识别传入自己的子令牌
+        """
+        return self.dispatcher.recognize(audio, cancel_token=cancel_token or self.cancel_token)
+
+    # ---- 标点 ----
+
+    def _add_punctuation(self, text, pause_duration=0):
+        """根据语音内容和停顿时间添加标点符号"""
+        if not text:
+            return text
+
+        # 去除首尾空格
+        text = text.strip()
+
+        # 如果文本已经以标点符号结尾，不再添加
+        if text.endswith(('。', '？', '！', '，', '、', '；', '：')):
+            return text
+
+        # 检查是否包含疑问词，如果是则添加问号
+        for keyword in self.sentence_keywords:
+            if keyword in text:
+                return text + "？"
+
+        return text + self._sentence_end(text, pause_duration)
+
+    def _sentence_end(self, text, pause_duration):
+        """非疑问句的结尾标点，由子类配置"""
+        return "。"
+
+    # ---- 监听会话 ----
+
+    def start_listening(self):
+        """开始监听语音"""
+        # 检查麦克风状态（设备在监听线程中打开，这里不重复打开）
+        is_ok, status_msg = self.check_microphone_status(probe=False)
+        if not is_ok:
+            if "麦克风设备未初始化" in status_msg:
+                self.error_occurred.emit("无法找到可用的麦克风设备！\n\n请检查麦克风是否正确连接到电脑。")
+            else:
+                self.error_occurred.emit(f"无法启动语音识别: {status_msg}")
+            return
+
+        # 正在监听、校准或上一次会话尚未结束时忽略
+        if not self._transition(self.LISTENING, expected=self.IDLE):
+            return
+
+        self.cancel_token = CancellationToken()
+        self.listen_thread = threading.Thread(target=self._listen_continuously)
+        self.listen_thread.daemon = True
+        self.listen_thread.start()
+        self.status_changed.emit(self.listening_text)
+
+    def stop_listening(self):
+        """停止监听语音；返回时麦克风已经释放，之后不会再发出识别结果"""
+        self._transition(self.STOPPING)
+        if self.cancel_token:
+            # 同步关闭采集、释放设备，并打断正在进行的分段和识别
+            self.cancel_token.cancel()
+        if self.listen_thread and self.listen_thread.is_alive():
+            self.listen_thread.join(timeout=1)
+        self.status_changed.emit("监听已停止")
+
+    def _listen_continuously(self):
+        """监听会话：整个会话只打开一次麦克风"""
+        cancel_token = self.cancel_token
+        try:
+            capture = AudioCaptureService(self.microphone, cancel_token=cancel_token)
+            source = capture.open()
+        except Exception as e:
+            self.error_occurred.emit(f"无法启动语音识别: 麦克风连接异常: {str(e)}")
+            self._transition(self.STOPPING)
+            self._transition(self.IDLE)
+            return
+
+        self.status_changed.emit("请说话...")
+        self._next_utterance = 0       # 下一句话的序号，与临时结果的序号一致
+        self._delivered_utterances = 0  # 已交付结果的句子数（按顺序交付）
+        pipeline = self._create_pipeline() if self.pipeline_mode else None
+        partials = self._create_partial_recognizer()
+        speculator = self._create_speculator()
+        try:
+            self._listen_loop_body(source, capture, pipeline, partials, speculator, cancel_token)
+        finally:
+            self._transition(self.STOPPING)
+            capture.close()
+            if partials:
+                partials.close()
+            if pipeline:
+                # 正常结束时等待已录制的语音识别完成，保证说过的话不丢失；停止监听时直接丢弃
+                pipeline.close(discard_pending=cancel_token.is_cancelled)
+            if speculator:
+                speculator.shutdown()
+                logger.debug("提前端点识别: %s", speculator.stats())
+            logger.debug("识别引擎: %s", self.dispatcher.stats())
+            # 停止监听时正在说的一句和流水线中被丢弃的语音不会再有最终结果，清除它们的临时结果
+            for utterance in range(self._delivered_utterances, self._next_utterance + 1):
+                self.partial_text.emit("", utterance)
+            self._transition(self.IDLE)
+
+    def _listen_loop_body(self, source, capture, pipeline, partials=None, speculator=None, cancel_token=None):
+        """
+        监听循环；pipeline 不为空时只负责录音，识别交给流水线；
+        partials 不为空时给出临时结果，speculator 不为空时在短暂停顿处提前识别
+        """
+        # 分段器在整个会话中保持状态（预录音缓冲、动态噪声阈值）
+        segmenter = create_segmenter(
+            self.recognizer, source, phrase_time_limit=30, pre_roll=self.pre_roll)
+        calibration_refined = False
+
+        while self.is_listening:
+            try:
+                start_time = time.time()
+
+                # 监听音频：等待10秒检测声音，允许30秒长语音
+                audio = segmenter.listen(
+                    capture.read_frame, timeout=10,
+                    partial_interval=self.partial_interval,
+                    on_partial=partials.submit if partials else None,
+                    speculative_pause=self.speculative_pause,
+                    on_pause=speculator.speculate if speculator else None,
+                    on_resume=speculator.cancel if speculator else None,
+                    cancel_token=cancel_token)
+                utterance = partials.finish_utterance() if partials else self._next_utterance
+                self._next_utterance = utterance + 1
+                if not audio.frame_data:
+                    # 采集已停止，或文件 / 合成音频源已读完
+                    if self._transition(self.STOPPING):
+                        self.status_changed.emit("音频源已读完，监听结束")
+                    break
+                if not calibration_refined:
+                    # 第一句话之前的背景噪声已经足以修正校准值
+                    self._refine_calibration(segmenter.energy_threshold)
+                    calibration_refined = True
+                # 短暂停顿时已提前识别的，直接使用那次识别
+                speculation = speculator.commit(audio) if speculator else None
+
+                end_time = time.time()
+                pause_duration = end_time - start_time
+
+                if pipeline:
+                    # 交给识别线程，立即继续录音
+                    pipeline.submit(audio, (pause_duration, end_time, utterance), result=speculation)
+                    continue
+
+                # 识别语音
+                self._recognition_started()
+                try:
+                    text = speculation.result() if speculation else self._recognize_audio(audio)
+                except Cancelled:
+                    break
+                except Exception as e:
+                    # 可重试的错误已在识别调度中按重试策略重试过，这里直接继续监听
+                    self._deliver_error(e, utterance)
+                    continue
+                if cancel_token is not None and cancel_token.is_cancelled:
+                    break
+                self._deliver_text(text, pause_duration, end_time, utterance)
+
+            except Cancelled:
+                # 停止监听
+                break
+            except sr.WaitTimeoutError:
+                # 10秒内没有检测到声音
+                if self._transition(self.STOPPING):
+                    self.status_changed.emit("长时间无语音，自动停止监听")
+                break
+            except Exception as e:
+                self.error_occurred.emit(f"监听错误: {str(e)}")
+                if not capture.is_open:
+                    # 设备已失效，继续循环没有意义
+                    self._transition(self.STOPPING)
+                    break
+                time.sleep(1)
+
+        # 保留本次会话自适应后的噪声阈值
+        self.recognizer.energy_threshold = segmenter.energy_threshold
+        self._refine_calibration(segmenter.energy_threshold)
+
+    def _create_pipeline(self):
+        """创建并启动识别流水线"""
+        self.pipeline = RecognitionPipeline(
+            self._recognize_audio,
+            on_result=self._on_pipeline_result,
+            on_error=self._on_pipeline_error,
+            on_start=lambda context: self._recognition_started(),
+            max_pending=self.max_pending_utterances,
+            workers=self.recognition_workers,
+            cancel_token=self.cancel_token,
+        )
+        self.pipeline.start()
+        return self.pipeline
+
+    def _create_partial_recognizer(self):
+        """创建临时结果识别器；partial_interval 为 0 时返回 None"""
+        if not self.partial_interval:
+            return None
+        partials = PartialRecognizer(self._recognize_split, on_partial=self.partial_text.emit)
+        partials.start()
+        return partials
+
+    def _create_speculator(self):
+        """创建提前端点识别器；speculative_pause 为 0 时返回 None"""
+        if not self.speculative_pause:
+            return None
+        self.speculator = SpeculativeRecognizer(self._recognize_split, cancel_token=self.cancel_token)
+        return self.speculator
+
+    def _recognition_started(self):
+        if self._transition(self.RECOGNIZING, expected=self.LISTENING):
+            self.status_changed.emit(self.recognizing_text)
+
+    def _recognition_finished(self):
+        """一句话的结果已交付；流水线中没有其他待交付的语音时回到 listening"""
+        if self.pipeline_mode and self.pipeline is not None and self.pipeline.pending():
+            return
+        self._transition(self.LISTENING, expected=self.RECOGNIZING)
+
+    def _on_pipeline_result(self, text, context):
+        """流水线按顺序交付的识别结果（替换这句话的临时结果）"""
+        pause_duration, end_time, utterance = context
+        self._deliver_text(text, pause_duration, end_time, utterance)
+
+    def _on_pipeline_error(self, error, context):
+        """流水线按顺序交付的识别错误"""
+        self._deliver_error(error, context[2])
+
+    def _deliver_text(self, text, pause_duration, end_time, utterance):
+        """输出第 utterance 句话的识别结果，替换这句话的临时结果"""
+        # 只清除这句话自己的临时结果；流水线模式下下一句话的临时结果可能已经显示
+        self._delivered_utterances = utterance + 1
+        self.partial_text.emit("", utterance)
+        if text:
+            # 添加标点符号
+            text_with_punctuation = self._add_punctuation(text, pause_duration)
+            self.text_recognized.emit(text_with_punctuation)
+            self.last_text_time = end_time
+            self.previous_text = text_with_punctuation
+        self._recognition_finished()
+        self.status_changed.emit("请继续说话...")
+
+    def _deliver_error(self, error, utterance):
+        """输出第 utterance 句话的识别错误"""
+        self._delivered_utterances = utterance + 1
+        self.partial_text.emit("", utterance)
+        self._recognition_finished()
+        if isinstance(error, sr.UnknownValueError):
+            # 没有识别到清晰的语音，但继续监听
+            self.status_changed.emit("请继续说话...")
+            return
+        self._emit_recognition_error(error)
+
+    def _emit_recognition_error(self, e):
+        """发出识别错误信息；超时、连接失败、服务端错误等网络问题给出统一的提示"""
+        if (isinstance(e, RecognitionTimeout) or retry_policy.classify(e) != retry_policy.NO_RETRY
+                or "Service Unavailable" in str(e)):
+            self.error_occurred.emit(NETWORK_ERROR_MESSAGE)
+        else:
+            self.error_occurred.emit(f"语音识别错误: {str(e)}")
+
+    def recognize_once(self):
+        """
+        单次语音识别：只识别一句话的监听会话，识别完成（或被 stop_listening 取消）后返回
+        与连续监听共用采集服务、分段器、取消令牌和状态机
+        """
+        # 检查麦克风状态（设备由采集服务打开，这里不重复打开）
+        is_ok, status_msg = self.check_microphone_status(probe=False)
+        if not is_ok:
+            if "麦克风设备未初始化" in status_msg:
+                self.error_occurred.emit("无法找到可用的麦克风设备！\n\n请检查麦克风是否正确连接到电脑。")
+            else:
+                self.error_occurred.emit(f"无法启动语音识别: {status_msg}")
+            return
+        if not self._transition(self.LISTENING, expected=self.IDLE):
+            return
+
+        self.cancel_token = CancellationToken()
+        session = self.listen_thread = threading.Thread(target=self._recognize_single)
+        session.daemon = True
+        session.start()
+        session.join()
+
+    def _recognize_single(self):
+        """单次识别会话：识别一句话后结束"""
+        cancel_token = self.cancel_token
+        try:
+            capture = AudioCaptureService(self.microphone, cancel_token=cancel_token)
+            source = capture.open()
+        except Exception as e:
+            self.error_occurred.emit(f"无法启动语音识别: 麦克风连接异常: {str(e)}")
+            self._transition(self.STOPPING)
+            self._transition(self.IDLE)
+            return
+
+        segmenter = None
+        try:
+            segmenter = create_segmenter(
+                self.recognizer, source, phrase_time_limit=10, pre_roll=self.pre_roll)
+            start_time = time.time()
+            self.status_changed.emit("请说话...")
+            # 监听音频，最长10秒
+            audio = segmenter.listen(capture.read_frame, timeout=10, cancel_token=cancel_token)
+            if not audio.frame_data:
+                # 采集已停止，或文件 / 合成音频源已读完
+                self.status_changed.emit("未识别到语音")
+                return
+
+            end_time = time.time()
+            pause_duration = end_time - start_time
+
+            self._recognition_started()
+            text = self._recognize_audio(audio)
+            if cancel_token.is_cancelled:
+                return
+
+            if text:
+                # 添加标点符号
+                text_with_punctuation = self._add_punctuation(text, pause_duration)
+                self.text_recognized.emit(text_with_punctuation)
+                self.status_changed.emit("识别完成")
+            else:
+                self.status_changed.emit("未识别到语音")
+
+        except Cancelled:
+            # 停止监听
+            pass
+        except sr.UnknownValueError:
+            self.status_changed.emit("未识别到清晰的语音")
+        except sr.WaitTimeoutError:
+            self.status_changed.emit("录音超时")
+        except Exception as e:
+            self._emit_recognition_error(e)
+        finally:
+            self._transition(self.STOPPING)
+            capture.close()
+            if segmenter is not None:
+                self.recognizer.energy_threshold = segmenter.energy_threshold
+            self._transition(self.IDLE)
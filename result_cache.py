@@ -0,0 +1,184 @@
+"""
+识别结果缓存
+同一段音频不重复请求识别引擎：网络出错后重试同一段语音、批量转写重复运行时直接返回缓存的结果。
+- 键：规范化 PCM 的哈希 + 引擎配置 + 语言。PCM 统一为 16bit、去掉首尾的数字静音（全零采样），
+  采样率计入哈希（不重采样，避免依赖 audioop）
+- 按 LRU 淘汰，同时限制条目数和文本总字节数
+- "未识别到语音"也会缓存（值为空字符串），命中时照样抛出 sr.UnknownValueError；其他错误不缓存
+- 可选持久化到磁盘（JSONL，只追加；文件过大时压缩重写），重新处理整批录音不需要再调用引擎
+
+默认缓存只在内存中；设置环境变量 RECORDMYTALK_RESULT_CACHE 为文件路径即持久化到该文件。
+"""
+import collections
+import hashlib
+import json
+import os
+import threading
+
+import speech_recognition as sr
+
+from audio_sources import _to_mono16
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+
+def audio_fingerprint(audio):
+    """规范化 PCM 的哈希（十六进制字符串）"""
+    data = _to_mono16(audio.frame_data, audio.sample_width, 1)
+    # 去掉首尾的全零采样（按采样对齐）
+    start = (len(data) - len(data.lstrip(b"\x00"))) // 2 * 2
+    end = max(start, (len(data.rstrip(b"\x00")) + 1) // 2 * 2)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(audio.sample_rate).encode("ascii"))
+    digest.update(memoryview(data)[start:end])
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU 识别结果缓存（线程安全）"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, path=None):
+        """
+        max_entries: 最多缓存的条目数
+        max_bytes: 键和文本（UTF-8）的总字节数上限
+        path: 持久化文件路径，None 表示只在内存中
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._log_lines = 0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._load()
+
+    @staticmethod
+    def make_key(audio, engine, language):
+        return f"{engine}|{language}|{audio_fingerprint(audio)}"
+
+    @staticmethod
+    def _size(key, text):
+        return len(key) + len(text.encode("utf-8"))
+
+    def get(self, key):
+        """返回缓存的文本（空字符串表示未识别到语音），没有时返回 None"""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._store(key, text)
+            if self.path:
+                self._append(key, text)
+
+    def recognize(self, recognize, audio, engine, language):
+        """
+        先查缓存，未命中时调用 recognize(audio) 并缓存结果
+        engine / language: 计入缓存键，不同引擎配置或语言的结果互不混用
+        """
+        key = self.make_key(audio, engine, language)
+        text = self.get(key)
+        if text is not None:
+            if not text:
+                raise sr.UnknownValueError()
+            return text
+        try:
+            text = recognize(audio)
+        except sr.UnknownValueError:
+            self.put(key, "")
+            raise
+        if text:
+            self.put(key, text)
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.path:
+                self._rewrite()
+
+    def _store(self, key, text):
+        """写入内存并按条目数 / 字节数淘汰最久未使用的条目（调用方持有锁）"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= self._size(key, previous)
+        size = self._size(key, text)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = text
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, old_text = self._entries.popitem(last=False)
+            self._bytes -= self._size(old_key, old_text)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._store(entry["key"], entry["text"])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # 写到一半的行
+                    self._log_lines += 1
+        except OSError:
+            pass
+
+    def _append(self, key, text):
+        """追加一行；日志行数远多于有效条目时压缩重写（调用方持有锁）"""
+        try:
+            if self._log_lines > 2 * max(len(self._entries), 64):
+                self._rewrite()
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n")
+            self._log_lines += 1
+        except OSError as e:
+            print(f"识别结果缓存写入失败: {e}")
+
+    def _rewrite(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key, text in self._entries.items():
+                f.write(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.path)
+        self._log_lines = len(self._entries)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """进程内共享的缓存；RECORDMYTALK_RESULT_CACHE 指定持久化文件"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache(path=os.environ.get("RECORDMYTALK_RESULT_CACHE") or None)
+        return _default_cache
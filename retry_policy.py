@@ -0,0 +1,183 @@
+"""
+识别请求重试策略
+所有识别引擎共用，按错误类型决定是否重试、何时重试，代替出错后固定等待 2 秒：
+- 连接被重置（如复用的长连接已被服务器关闭）：立即重试一次
+- 超时、连接失败、HTTP 5xx / 429 限流：指数退避 + 随机抖动（full jitter）后重试
+- 未识别到语音（sr.UnknownValueError）及其他错误（如未配置密钥、4xx）：不重试
+- 截止时间：每次识别有截止时间，来不及在截止前重试时直接抛出，不再等待
+- 重试预算：重试次数不超过请求数的一定比例，服务整体故障时重试不会放大请求量
+
+错误类型沿异常链（__cause__ / __context__）判断，引擎包装层重新抛出的异常也能识别出原始错误。
+"""
+import http.client
+import logging
+import random
+import socket
+import threading
+import time
+
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+IMMEDIATE = "immediate"
+BACKOFF = "backoff"
+NO_RETRY = "no_retry"
+
+# 连接被对方重置：多半是空闲连接被关闭，换一个连接立即重试即可
+_RESET_ERRORS = (ConnectionResetError, ConnectionAbortedError, BrokenPipeError,
+                 http.client.BadStatusLine, http.client.CannotSendRequest)
+
+
+def _error_chain(error):
+    """异常本身及其 __cause__ / __context__ 链"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def is_timeout(error):
+    """是否为请求超时（连接或读取超时，包括被 urllib / 引擎包装层重新抛出的）"""
+    for e in _error_chain(error):
+        if isinstance(e, (TimeoutError, socket.timeout)):
+            return True
+        if isinstance(getattr(e, "reason", None), (TimeoutError, socket.timeout)):
+            return True
+    return False
+
+
+def _status_code(error):
+    """HTTP 状态码（urllib 的 HTTPError.code，或 baidu_client 设置的 status），没有时返回 None"""
+    for name in ("code", "status"):
+        value = getattr(error, name, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    return None
+
+
+def classify(error):
+    """返回错误的重试方式：IMMEDIATE / BACKOFF / NO_RETRY"""
+    for e in _error_chain(error):
+        if isinstance(e, sr.UnknownValueError):
+            return NO_RETRY
+        status = _status_code(e)
+        if status is not None:
+            return BACKOFF if status == 429 or status >= 500 else NO_RETRY
+        if isinstance(e, _RESET_ERRORS):
+            return IMMEDIATE
+        if isinstance(e, OSError):
+            # 超时、连接被拒绝、DNS 解析失败等（urllib 的 URLError 也是 OSError）
+            return BACKOFF
+    return NO_RETRY
+
+
+class RetryPolicy:
+    """识别请求重试策略（线程安全，所有引擎共用一个实例以共享重试预算）"""
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=4.0, deadline=8.0,
+                 budget_ratio=0.2, budget_max=10.0):
+        """
+        max_attempts: 每次识别最多尝试的次数（含第一次）
+        base_delay: 第一次退避的上限秒数，之后每次翻倍
+        max_delay: 单次退避的上限秒数
+        deadline: 每次识别从开始到放弃的秒数，None 表示不限制
+        budget_ratio: 每个请求存入的重试令牌数，即长期来看重试数 / 请求数的上限
+        budget_max: 令牌上限（也是初始值），允许短时间内连续重试的次数
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self._tokens = budget_max
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.budget_exhausted = 0
+        self.deadline_exceeded = 0
+
+    def deadline_from_now(self):
+        """按 deadline 计算的截止时间（time.monotonic），未设置时返回 None"""
+        return time.monotonic() + self.deadline if self.deadline else None
+
+    def backoff(self, retry_number):
+        """第 retry_number 次退避的等待秒数（full jitter：0 到指数上限之间均匀随机）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry_number)))
+
+    def call(self, func, *args, deadline=None, cancel_event=None):
+        """
+        调用 func(*args)，按错误类型重试
+        deadline: 截止时间（time.monotonic），None 时按 self.deadline 从现在开始计算
+        cancel_event: threading.Event（或 CancellationToken），置位后不再重试，退避等待也随即结束
+                      （如对冲请求已由其他引擎得到结果、停止监听）
+        """
+        if deadline is None:
+            deadline = self.deadline_from_now()
+        with self._lock:
+            self._tokens = min(self.budget_max, self._tokens + self.budget_ratio)
+
+        attempt = 0
+        backoffs = 0
+        immediate_used = False
+        while True:
+            try:
+                return func(*args)
+            except Exception as e:
+                attempt += 1
+                kind = classify(e)
+                if kind == NO_RETRY or attempt >= self.max_attempts:
+                    raise
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+                if kind == IMMEDIATE and not immediate_used:
+                    immediate_used = True
+                    delay = 0.0
+                else:
+                    delay = self.backoff(backoffs)
+                    backoffs += 1
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    with self._lock:
+                        self.deadline_exceeded += 1
+                    raise
+                if not self._take_token():
+                    raise
+                logger.debug("识别请求重试（第 %d 次，%.2f 秒后）: %s", attempt, delay, e)
+                if cancel_event is not None:
+                    if cancel_event.wait(delay):
+                        raise
+                elif delay:
+                    time.sleep(delay)
+
+    def _take_token(self):
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_exhausted += 1
+                return False
+            self._tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self):
+        """重试次数、因预算耗尽 / 截止时间放弃重试的次数"""
+        with self._lock:
+            return {
+                'retries': self.retries,
+                'budget_exhausted': self.budget_exhausted,
+                'deadline_exceeded': self.deadline_exceeded,
+                'budget_tokens': round(self._tokens, 2),
+            }
+
+
+_default_policy = None
+_default_lock = threading.Lock()
+
+
+def get_default_policy():
+    """进程内共享的重试策略"""
+    global _default_policy
+    with _default_lock:
+        if _default_policy is None:
+            _default_policy = RetryPolicy()
+        return _default_policy
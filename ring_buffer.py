@@ -0,0 +1,56 @@
+"""
+音频环形缓冲区
+在预先分配的 bytearray 上通过 memoryview 写入最近的音频帧，写入时不产生新的对象；
+检测到说话开始时取出最近一段音频（预录音），拼到语音片段的开头，避免开头的音节被截掉。
+"""
+
+
+class FrameRingBuffer:
+    """固定容量的字节环形缓冲区"""
+
+    def __init__(self, capacity):
+        """capacity: 缓冲区字节数"""
+        self.capacity = max(1, int(capacity))
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._pos = 0      # 下一次写入的位置
+        self._filled = 0   # 已写入的有效字节数
+
+    def __len__(self):
+        return self._filled
+
+    def clear(self):
+        self._pos = 0
+        self._filled = 0
+
+    def write(self, data):
+        """写入一帧数据；超过容量时覆盖最旧的数据"""
+        data = memoryview(data).cast("B")
+        size = len(data)
+        if size >= self.capacity:
+            data = data[size - self.capacity:]
+            size = self.capacity
+        end = self._pos + size
+        if end <= self.capacity:
+            self._view[self._pos:end] = data
+        else:
+            first = self.capacity - self._pos
+            self._view[self._pos:] = data[:first]
+            self._view[:size - first] = data[first:]
+        self._pos = end % self.capacity
+        self._filled = min(self.capacity, self._filled + size)
+
+    def views(self, size=None):
+        """返回最近 size 字节（默认全部）的只读视图，按时间顺序最多两段，不复制数据"""
+        size = self._filled if size is None else max(0, min(int(size), self._filled))
+        start = (self._pos - size) % self.capacity
+        if start + size <= self.capacity:
+            return [self._view[start:start + size].toreadonly()]
+        return [self._view[start:].toreadonly(), self._view[:self._pos].toreadonly()]
+
+    def read_last(self, size=None):
+        """复制出最近 size 字节，用于拼接到语音片段开头"""
+        out = bytearray()
+        for view in self.views(size):
+            out += view
+        return out
@@ -0,0 +1,486 @@
+"""
+语音分段模块
+代替 sr.Recognizer.listen：从采集服务逐帧取音频，判断说话开始/结束，输出完整的语音片段。
+- 检测到说话开始时，把环形缓冲区中最近 pre_roll 秒的音频拼到片段开头，开头的音节不会被截掉
+- 分段逻辑（状态机）与"一帧是否为语音"的判断分离，判断方法可以替换（见 EnergySegmenter）
+- 单句达到 phrase_time_limit 时不再硬切，而是在最后 split_window 秒内能量最低处切开，
+  后半部分接着作为下一句；split_points 用同样的方法把长语音切成较短的片段以便并行识别
+- 不依赖 audioop（Python 3.13 已移除）：EnergySegmenter 用 array 计算 RMS，
+  VadSegmenter 用 NumPy 按整段音频计算能量、过零率和平滑后的语音概率
+"""
+import collections
+import math
+from array import array
+
+import speech_recognition as sr
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from ring_buffer import FrameRingBuffer
+
+# 分段事件：kind 为 'start' 或 'end'；audio 为 'end' 时的完整片段（bytes）；
+# start / end 为片段在音频流中的起止时间（秒）
+SegmentEvent = collections.namedtuple("SegmentEvent", "kind audio start end")
+
+_ARRAY_TYPECODES = {1: "b", 2: "h", 4: "i"}
+_SPLIT_FRAME_SECONDS = 0.02  # 找切点时的分帧长度
+
+
+def frame_energies(data, sample_width, frame_bytes):
+    """按 frame_bytes 分帧计算 RMS 能量，末尾不足一帧的部分忽略"""
+    count = len(data) // frame_bytes
+    if not count:
+        return []
+    typecode = _ARRAY_TYPECODES.get(sample_width)
+    if typecode is None:
+        return [0.0] * count
+    if NUMPY_AVAILABLE:
+        dtype = {1: np.int8, 2: "<i2", 4: "<i4"}[sample_width]
+        samples = np.frombuffer(data, dtype=dtype, count=count * frame_bytes // sample_width).astype(np.float64)
+        frames = samples.reshape(count, -1)
+        return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1]).tolist()
+    energies = []
+    for offset in range(0, count * frame_bytes, frame_bytes):
+        samples = array(typecode, bytes(data[offset:offset + frame_bytes]))
+        energies.append(math.sqrt(sum(s * s for s in samples) / float(len(samples))))
+    return energies
+
+
+def quietest_offset(data, sample_width, frame_bytes, lo, hi):
+    """在 data[lo:hi] 中找能量最低的一帧，返回该帧中点的字节偏移（按采样对齐）"""
+    lo = lo // frame_bytes * frame_bytes
+    energies = frame_energies(bytes(data[lo:hi]), sample_width, frame_bytes)
+    if not energies:
+        return hi // sample_width * sample_width
+    best = min(range(len(energies)), key=energies.__getitem__)
+    return lo + best * frame_bytes + frame_bytes // 2 // sample_width * sample_width
+
+
+def split_points(data, sample_rate, sample_width, max_length, min_length=None):
+    """
+    把一段长语音在内部能量最低处切开，使每段不超过 max_length 秒，返回切点的字节偏移列表
+    每个切点在距上一个切点 [min_length, max_length] 秒的范围内选取，min_length 默认为 max_length 的一半
+    """
+    frame_bytes = max(1, int(_SPLIT_FRAME_SECONDS * sample_rate)) * sample_width
+    max_bytes = int(max_length * sample_rate) * sample_width
+    min_bytes = int((max_length / 2.0 if min_length is None else min_length) * sample_rate) * sample_width
+    if max_bytes <= 0 or len(data) <= max_bytes:
+        return []
+    points = []
+    position = 0
+    while len(data) - position > max_bytes:
+        cut = quietest_offset(data, sample_width, frame_bytes, position + min_bytes, position + max_bytes)
+        if cut <= position:
+            cut = position + max_bytes
+        points.append(cut)
+        position = cut
+    return points
+
+
+class Segmenter:
+    """语音分段器基类：实现分段状态机，子类实现 _classify"""
+
+    WAITING = "waiting"
+    SPEAKING = "speaking"
+
+    def __init__(self, sample_rate, sample_width, pause_threshold=0.8, phrase_threshold=0.3,
+                 phrase_time_limit=None, pre_roll=0.3, post_roll=0.5, split_window=3.0):
+        """
+        pause_threshold: 说话中静音超过该秒数即认为一句话结束
+        phrase_threshold: 有效语音的最短时长，短于此的片段（如咳嗽、敲击）被丢弃
+        phrase_time_limit: 单句最长秒数，超过后在最后 split_window 秒内能量最低处切分
+        pre_roll: 拼到片段开头的、触发之前的音频秒数
+        post_roll: 片段末尾保留的静音秒数
+        """
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.pause_threshold = pause_threshold
+        self.phrase_threshold = phrase_threshold
+        self.phrase_time_limit = phrase_time_limit
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.split_window = split_window
+
+        self._bytes_per_second = sample_rate * sample_width
+        pre_roll_bytes = self._align(pre_roll * self._bytes_per_second)
+        self._ring = FrameRingBuffer(max(pre_roll_bytes, sample_width))
+        self._pre_roll_bytes = pre_roll_bytes
+        self._split_frame_bytes = max(1, int(_SPLIT_FRAME_SECONDS * sample_rate)) * sample_width
+        self._pending = collections.deque()
+        self.reset()
+
+    def _align(self, size):
+        return int(size) // self.sample_width * self.sample_width
+
+    def reset(self):
+        """丢弃当前状态，重新开始等待说话"""
+        self.state = self.WAITING
+        self.position = 0.0  # 已处理的音频时长（秒）
+        self._utterance = bytearray()
+        self._utterance_start = 0.0
+        self._lead_bytes = 0
+        self._silence = 0.0
+        self._trailing_silence_bytes = 0
+        self._ring.clear()
+        self._pending.clear()
+
+    def _classify(self, data):
+        """
+        判断 data 中每一帧是否为语音，返回 [(帧字节数, 是否为语音), ...]
+        子类实现；帧的切分方式由子类决定
+        """
+        raise NotImplementedError
+
+    def feed(self, data):
+        """送入一段音频，返回其中产生的分段事件列表"""
+        events = []
+        view = memoryview(data).cast("B")
+        offset = 0
+        for size, is_speech in self._classify(data):
+            frame = view[offset:offset + size]
+            offset += size
+            event = self._step(frame, is_speech, size / float(self._bytes_per_second))
+            if event:
+                events.append(event)
+        return events
+
+    def _step(self, frame, is_speech, duration):
+        """状态机处理一帧"""
+        self.position += duration
+        if self.state == self.WAITING:
+            if not is_speech:
+                self._ring.write(frame)
+                return None
+            # 说话开始：环形缓冲中的预录音 + 当前帧作为片段开头
+            self.state = self.SPEAKING
+            self._utterance = self._ring.read_last(self._pre_roll_bytes)
+            self._lead_bytes = len(self._utterance)
+            self._utterance += frame
+            self._utterance_start = self.position - len(self._utterance) / float(self._bytes_per_second)
+            self._silence = 0.0
+            self._trailing_silence_bytes = 0
+            return SegmentEvent("start", None, self._utterance_start, None)
+
+        self._utterance += frame
+        if is_speech:
+            self._silence = 0.0
+            self._trailing_silence_bytes = 0
+        else:
+            self._silence += duration
+            self._trailing_silence_bytes += len(frame)
+
+        length = len(self._utterance) / float(self._bytes_per_second)
+        if self._silence >= self.pause_threshold:
+            return self._finish()
+        if self.phrase_time_limit and length >= self.phrase_time_limit:
+            return self._split()
+        return None
+
+    def _split(self):
+        """单句过长：在最后 split_window 秒内能量最低处切开，前半部分输出，后半部分作为下一句的开头"""
+        utterance = self._utterance
+        window = self._align(self.split_window * self._bytes_per_second)
+        lo = max(self._lead_bytes, len(utterance) - window)
+        cut = quietest_offset(utterance, self.sample_width, self._split_frame_bytes, lo, len(utterance))
+        head = bytes(utterance[:cut])
+        start = self._utterance_start
+        end = start + len(head) / float(self._bytes_per_second)
+        self._utterance = bytearray(utterance[cut:])
+        self._utterance_start = end
+        self._lead_bytes = 0
+        self._trailing_silence_bytes = min(self._trailing_silence_bytes, len(self._utterance))
+        self._silence = self._trailing_silence_bytes / float(self._bytes_per_second)
+        return SegmentEvent("end", head, start, end)
+
+    def _finish(self):
+        """结束当前片段：去掉多余的尾部静音，过短的片段直接丢弃"""
+        utterance = self._utterance
+        keep_silence = min(self._trailing_silence_bytes, self._align(self.post_roll * self._bytes_per_second))
+        cut = self._trailing_silence_bytes - keep_silence
+        if cut:
+            del utterance[len(utterance) - cut:]
+        speech = (len(utterance) - keep_silence - self._lead_bytes) / float(self._bytes_per_second)
+        start = self._utterance_start
+        self.state = self.WAITING
+        self._utterance = bytearray()
+        self._ring.clear()
+        if speech < self.phrase_threshold:
+            return None
+        end = start + len(utterance) / float(self._bytes_per_second)
+        return SegmentEvent("end", bytes(utterance), start, end)
+
+    def flush(self):
+        """音频流结束时输出尚未结束的片段"""
+        if self.state == self.SPEAKING:
+            return self._finish()
+        return None
+
+    def current_audio(self):
+        """正在说的这句话目前为止的音频（sr.AudioData），未在说话时返回 None"""
+        if self.state != self.SPEAKING:
+            return None
+        return sr.AudioData(bytes(self._utterance), self.sample_rate, self.sample_width)
+
+    def listen(self, read_frame, timeout=None, partial_interval=None, on_partial=None,
+               speculative_pause=None, on_pause=None, on_resume=None, cancel_token=None):
+        """
+        与 Recognizer.listen 用法一致：读取音频直到得到一句完整的话，返回 sr.AudioData
+        read_frame: 返回下一段音频的函数，返回空字节串表示音频流结束
+        timeout: 等待说话开始的最长秒数，超时抛出 sr.WaitTimeoutError
+        partial_interval / on_partial: 说话过程中这句话每增长 partial_interval 秒，
+                                       调用一次 on_partial(目前为止的 sr.AudioData)，用于临时结果
+        speculative_pause / on_pause / on_resume: 说话中静音达到 speculative_pause 秒（短于 pause_threshold）时
+                                       调用 on_pause(目前为止的 sr.AudioData)，用于提前识别；之后又开始说话、
+                                       或这句话没有因停顿正常结束（过长被切分、过短被丢弃）时调用 on_resume()
+        cancel_token: cancellation.CancellationToken，取消后在下一帧之前抛出 Cancelled，
+                      已录到一半的这句话直接丢弃
+        """
+        waited = 0.0
+        partial_start = None
+        partial_due = 0.0
+        paused = False
+        while True:
+            while self._pending:
+                event = self._pending.popleft()
+                if event.kind == "end":
+                    return sr.AudioData(event.audio, self.sample_rate, self.sample_width)
+
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            data = read_frame()
+            if not data:
+                event = self.flush()
+                if event:
+                    return sr.AudioData(event.audio, self.sample_rate, self.sample_width)
+                return sr.AudioData(b"", self.sample_rate, self.sample_width)
+
+            was_waiting = self.state == self.WAITING
+            self._pending.extend(self.feed(data))
+            if was_waiting and self.state == self.WAITING and not self._pending:
+                waited += len(data) / float(self._bytes_per_second)
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+            if on_partial and partial_interval and self.state == self.SPEAKING and not self._pending:
+                if partial_start != self._utterance_start:
+                    # 新的一句（或过长被切分后的后半句）
+                    partial_start = self._utterance_start
+                    partial_due = partial_interval
+                length = len(self._utterance) / float(self._bytes_per_second)
+                if length >= partial_due:
+                    partial_due = length + partial_interval
+                    on_partial(self.current_audio())
+
+            if on_pause and speculative_pause:
+                speaking = self.state == self.SPEAKING
+                if self._pending:
+                    if paused and speaking:
+                        # 这句话因过长被切分，而不是因停顿结束
+                        paused = False
+                        on_resume()
+                elif speaking and self._silence >= speculative_pause:
+                    if not paused:
+                        paused = True
+                        on_pause(self.current_audio())
+                elif paused:
+                    # 又开始说话，或片段过短被丢弃
+                    paused = False
+                    on_resume()
+
+
+class EnergySegmenter(Segmenter):
+    """
+    基于帧能量（RMS）的分段器，行为与 sr.Recognizer.listen 一致：
+    能量超过阈值即为语音；等待说话时按非对称加权平均动态调整阈值
+    """
+
+    def __init__(self, sample_rate, sample_width, frame_samples=1024, energy_threshold=300,
+                 dynamic_energy_threshold=True, dynamic_energy_adjustment_damping=0.15,
+                 dynamic_energy_ratio=1.5, **kwargs):
+        self.frame_bytes = frame_samples * sample_width
+        self.energy_threshold = energy_threshold
+        self.dynamic_energy_threshold = dynamic_energy_threshold
+        self.dynamic_energy_adjustment_damping = dynamic_energy_adjustment_damping
+        self.dynamic_energy_ratio = dynamic_energy_ratio
+        super().__init__(sample_rate, sample_width, **kwargs)
+
+    @classmethod
+    def from_recognizer(cls, recognizer, source, **kwargs):
+        """沿用 sr.Recognizer 上已配置（或已校准）的参数"""
+        return cls(
+            source.SAMPLE_RATE, source.SAMPLE_WIDTH,
+            frame_samples=source.CHUNK,
+            energy_threshold=recognizer.energy_threshold,
+            dynamic_energy_threshold=recognizer.dynamic_energy_threshold,
+            dynamic_energy_adjustment_damping=recognizer.dynamic_energy_adjustment_damping,
+            dynamic_energy_ratio=recognizer.dynamic_energy_ratio,
+            pause_threshold=recognizer.pause_threshold,
+            phrase_threshold=recognizer.phrase_threshold,
+            post_roll=recognizer.non_speaking_duration,
+            **kwargs)
+
+    def _rms(self, frame):
+        typecode = _ARRAY_TYPECODES.get(self.sample_width)
+        if typecode is None or not frame:
+            return 0.0
+        samples = array(typecode, frame[:len(frame) - len(frame) % self.sample_width])
+        if not samples:
+            return 0.0
+        return math.sqrt(sum(s * s for s in samples) / float(len(samples)))
+
+    def _classify(self, data):
+        results = []
+        for offset in range(0, len(data), self.frame_bytes):
+            frame = data[offset:offset + self.frame_bytes]
+            energy = self._rms(frame)
+            is_speech = energy > self.energy_threshold
+            if not is_speech and self.state == self.WAITING and self.dynamic_energy_threshold:
+                # 与 Recognizer.listen 相同的动态阈值调整
+                seconds = len(frame) / float(self._bytes_per_second)
+                damping = self.dynamic_energy_adjustment_damping ** seconds
+                target = energy * self.dynamic_energy_ratio
+                self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+            results.append((len(frame), is_speech))
+        return results
+
+
+class VadSegmenter(Segmenter):
+    """
+    NumPy 向量化的语音活动检测分段器
+    对整段音频一次计算每帧的能量（dB）、过零率（逐采样的计算都在 NumPy 中完成），
+    再逐帧合成语音概率并做指数平滑：
+    - 能量高出背景噪声 snr_db 以上倾向于语音
+    - 过零率很高（如风声、嘶嘶声这类宽带噪声）时降低语音概率
+    背景噪声电平在非语音帧上自适应更新
+    平滑和噪声跟踪本身是逐帧递推，每秒只有几十帧，用标量循环比为几帧调用一串 NumPy 函数更快；
+    每次送入的音频通常只有几帧（一个 CHUNK），NumPy 调用的固定开销决定了耗时，所以逐采样部分也尽量少调用
+    """
+
+    def __init__(self, sample_rate, sample_width, frame_ms=16, energy_threshold=300,
+                 dynamic_energy_threshold=True, dynamic_energy_adjustment_damping=0.15,
+                 dynamic_energy_ratio=1.5, snr_db=None, zcr_max=0.35, zcr_weight=30.0,
+                 smoothing=0.6, **kwargs):
+        """
+        energy_threshold: 初始的语音能量阈值（RMS），背景噪声取其 1/dynamic_energy_ratio
+        snr_db: 判为语音所需高出背景噪声的分贝数，默认与 dynamic_energy_ratio 对应
+        zcr_max / zcr_weight: 过零率超过 zcr_max 的部分按 zcr_weight 降低语音倾向
+        smoothing: 语音概率的平滑系数（0 表示不平滑）
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("VadSegmenter 需要 NumPy")
+        self.frame_samples = max(1, int(sample_rate * frame_ms / 1000))
+        self.dynamic_energy_threshold = dynamic_energy_threshold
+        self.dynamic_energy_adjustment_damping = dynamic_energy_adjustment_damping
+        self.dynamic_energy_ratio = dynamic_energy_ratio
+        self.snr_db = 20 * math.log10(dynamic_energy_ratio) if snr_db is None else snr_db
+        self.zcr_max = zcr_max
+        self.zcr_weight = zcr_weight
+        self.smoothing = smoothing
+        self.noise_db = 20 * math.log10(max(1.0, energy_threshold / dynamic_energy_ratio))
+        self._probability = 0.0
+        super().__init__(sample_rate, sample_width, **kwargs)
+
+    @classmethod
+    def from_recognizer(cls, recognizer, source, **kwargs):
+        """沿用 sr.Recognizer 上已配置（或已校准）的参数"""
+        return cls(
+            source.SAMPLE_RATE, source.SAMPLE_WIDTH,
+            energy_threshold=recognizer.energy_threshold,
+            dynamic_energy_threshold=recognizer.dynamic_energy_threshold,
+            dynamic_energy_adjustment_damping=recognizer.dynamic_energy_adjustment_damping,
+            dynamic_energy_ratio=recognizer.dynamic_energy_ratio,
+            pause_threshold=recognizer.pause_threshold,
+            phrase_threshold=recognizer.phrase_threshold,
+            post_roll=recognizer.non_speaking_duration,
+            **kwargs)
+
+    @property
+    def energy_threshold(self):
+        """与 Recognizer.energy_threshold 含义相同的等效 RMS 阈值"""
+        return 10 ** ((self.noise_db + self.snr_db) / 20)
+
+    def reset(self):
+        super().reset()
+        self._probability = 0.0
+
+    def _samples(self, data):
+        if self.sample_width == 3:
+            raw = np.frombuffer(data, dtype=np.uint8, count=len(data) - len(data) % 3).reshape(-1, 3).astype(np.int32)
+            values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            return np.where(values & 0x800000, values - (1 << 24), values).astype(np.float64)
+        dtype = {1: np.int8, 2: "<i2", 4: "<i4"}[self.sample_width]
+        return np.frombuffer(data, dtype=dtype, count=len(data) // self.sample_width).astype(np.float64)
+
+    def analyze(self, data):
+        """
+        计算 data 中每帧的特征，返回 (帧长列表, 能量 dB, 过零率, 平滑后的语音概率)
+        会推进内部状态（平滑概率、背景噪声）
+        """
+        samples = self._samples(data)
+        count = samples.size
+        if not count:
+            empty = np.zeros(0)
+            return [], empty, empty, empty
+        n = self.frame_samples
+        full, rest = divmod(count, n)
+        sizes = [n] * full + ([rest] if rest else [])
+
+        if rest:
+            # 不足一帧的尾部补零后与完整帧一起计算，均值按真实长度
+            frames = np.zeros((len(sizes), n))
+            frames.reshape(-1)[:count] = samples
+            lengths = np.array(sizes, dtype=np.float64)
+            pairs = np.maximum(lengths - 1, 1)
+        else:
+            frames = samples.reshape(full, n)
+            lengths = float(n)
+            pairs = float(max(n - 1, 1))
+        energy_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / lengths + 1e-10)
+        signs = frames < 0
+        zcr = np.add.reduce(signs[:, 1:] != signs[:, :-1], axis=1) / pairs
+
+        probability = self._probabilities(energy_db.tolist(), zcr.tolist(), n / float(self.sample_rate))
+        return sizes, energy_db, zcr, np.array(probability)
+
+    def _probabilities(self, energy_db, zcr, frame_seconds):
+        """
+        逐帧计算平滑后的语音概率 y[i] = a*y[i-1] + (1-a)*x[i]；
+        判断都按本段开始时的背景噪声，之后再用非语音帧更新背景噪声（衰减系数与 Recognizer.listen 相同）
+        """
+        a = self.smoothing
+        offset = self.noise_db + self.snr_db
+        previous = self._probability
+        probability = []
+        noise_frames = []
+        for energy, rate in zip(energy_db, zcr):
+            logit = (energy - offset) / 2.0 - self.zcr_weight * max(0.0, rate - self.zcr_max)
+            raw = 1.0 / (1.0 + math.exp(-min(50.0, max(-50.0, logit))))
+            previous = a * previous + (1 - a) * raw if a > 0 else raw
+            probability.append(previous)
+            if previous < 0.5:
+                noise_frames.append(energy)
+        self._probability = previous
+
+        if self.dynamic_energy_threshold and noise_frames:
+            d = self.dynamic_energy_adjustment_damping ** frame_seconds
+            noise = self.noise_db
+            for energy in noise_frames:
+                noise = noise * d + energy * (1 - d)
+            self.noise_db = noise
+        return probability
+
+    def _classify(self, data):
+        sizes, _, _, probability = self.analyze(data)
+        width = self.sample_width
+        return [(size * width, p >= 0.5) for size, p in zip(sizes, probability.tolist())]
+
+
+def create_segmenter(recognizer, source, **kwargs):
+    """两个后端共用的分段器工厂：有 NumPy 时使用 VadSegmenter，否则退回 EnergySegmenter"""
+    if NUMPY_AVAILABLE:
+        return VadSegmenter.from_recognizer(recognizer, source, **kwargs)
+    return EnergySegmenter.from_recognizer(recognizer, source, **kwargs)
@@ -0,0 +1,61 @@
+"""
+文件音频源测试：不同位深和格式都转换为同样的 16bit 有符号 PCM
+（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests）
+"""
+import math
+import os
+import struct
+import subprocess
+import tempfile
+import unittest
+import wave
+
+import speech_recognition as sr
+
+from audio_sources import FileAudioSource
+
+
+def _find_converter():
+    try:
+        path = sr.get_flac_converter()
+    except OSError:
+        return None
+    return path if os.path.isfile(path) and os.access(path, os.X_OK) else None
+
+
+FLAC_CONVERTER = _find_converter()
+
+
+class EightBitFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.values = [int(100 * math.sin(i / 10.0)) for i in range(4000)]
+        self.wav_path = os.path.join(self.directory.name, "audio.wav")
+        with wave.open(self.wav_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(16000)
+            # 8bit WAV 是无符号的
+            f.writeframes(bytes((value + 128) & 0xFF for value in self.values))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _read_samples(self, path):
+        with FileAudioSource(path, realtime=False) as source:
+            data = source.stream.read(len(self.values))
+        return list(struct.unpack("<%dh" % (len(data) // 2), data))
+
+    def test_wav(self):
+        self.assertEqual(self._read_samples(self.wav_path), [value << 8 for value in self.values])
+
+    @unittest.skipUnless(FLAC_CONVERTER, "找不到 flac 程序")
+    def test_flac_matches_wav(self):
+        flac_path = os.path.join(self.directory.name, "audio.flac")
+        subprocess.run([FLAC_CONVERTER, "-s", "-f", "-o", flac_path, self.wav_path], check=True)
+        self.assertEqual(self._read_samples(flac_path), [value << 8 for value in self.values])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+百度识别客户端测试：token_url / asr_url 指向本地的模拟服务器
+（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests）
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import speech_recognition as sr
+
+import retry_policy
+from baidu_client import BaiduSpeechClient
+
+
+class _StandInServer(ThreadingHTTPServer):
+    """模拟百度的 token 和识别接口；asr_errors 中的错误码按顺序返回，用完后返回识别结果"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.token_requests = 0
+        self.asr_tokens = []        # 每次识别请求带的 token
+        self.asr_errors = []
+        self.connections = set()    # 识别请求使用过的客户端连接（客户端地址）
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持长连接
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        with server.lock:
+            if parts.path == "/token":
+                server.token_requests += 1
+                payload = {"access_token": f"token-{server.token_requests}", "expires_in": 2592000}
+            else:
+                server.asr_tokens.append(query["token"][0])
+                server.connections.add(self.client_address)
+                if server.asr_errors:
+                    payload = {"err_no": server.asr_errors.pop(0), "err_msg": "error"}
+                else:
+                    payload = {"err_no": 0, "result": [f"收到{len(body)}字节"]}
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class BaiduClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = _StandInServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = BaiduSpeechClient("key", "secret", token_url=self.server.url("/token"),
+                                        asr_url=self.server.url("/server_api"), timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_token_and_connection_reused(self):
+        for _ in range(3):
+            self.assertEqual(self.client.recognize_pcm(b"\0" * 3200), "收到3200字节")
+        self.assertEqual(self.server.token_requests, 1)
+        self.assertEqual(self.client.token_fetches, 1)
+        self.assertEqual(self.client.connections_opened, 1)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_token_error_refreshes_token_once(self):
+        self.client.get_token()
+        self.server.asr_errors = [3302]
+        self.assertEqual(self.client.recognize_pcm(b"\0" * 320), "收到320字节")
+        self.assertEqual(self.server.token_requests, 2)
+        self.assertEqual(self.server.asr_tokens, ["token-1", "token-2"])
+
+    def test_repeated_token_error_raises(self):
+        self.server.asr_errors = [3302, 3302]
+        with self.assertRaises(sr.RequestError):
+            self.client.recognize_pcm(b"\0" * 320)
+        self.assertEqual(self.server.token_requests, 2)
+
+    def test_server_errors_map_to_retryable_status(self):
+        for err_no, status in ((3303, 503), (3304, 429)):
+            with self.subTest(err_no=err_no):
+                self.server.asr_errors = [err_no]
+                with self.assertRaises(sr.RequestError) as context:
+                    self.client.recognize_pcm(b"\0" * 320)
+                self.assertEqual(context.exception.status, status)
+                self.assertEqual(retry_policy.classify(context.exception), retry_policy.BACKOFF)
+
+    def test_unrecognized_audio(self):
+        self.server.asr_errors = [3301]
+        with self.assertRaises(sr.UnknownValueError):
+            self.client.recognize_pcm(b"\0" * 320)
+
+
+if __name__ == "__main__":
+    unittest.main()
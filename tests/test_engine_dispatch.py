@@ -0,0 +1,75 @@
+"""
+识别调度与熔断器的交互测试（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests）
+"""
+import unittest
+
+from engine_dispatch import HedgedDispatcher
+from retry_policy import RetryPolicy
+
+
+class _ServiceUnavailable(Exception):
+    """模拟 HTTP 503"""
+    status = 503
+
+
+class _FlakyEngine:
+    """前 failures 次调用返回 503，之后返回 text"""
+
+    def __init__(self, failures, text="你好"):
+        self.failures = failures
+        self.text = text
+        self.calls = 0
+
+    def __call__(self, audio):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _ServiceUnavailable("Service Unavailable")
+        return self.text
+
+
+class RetryHealthTest(unittest.TestCase):
+
+    def _dispatcher(self, engine):
+        policy = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0, deadline=None)
+        return HedgedDispatcher([{'name': 'Google', 'method': engine}], hedge_delay_ms=None,
+                                retry_policy=policy)
+
+    def test_retries_that_all_fail_count_as_one_failure(self):
+        engine = _FlakyEngine(failures=10)
+        dispatcher = self._dispatcher(engine)
+        try:
+            with self.assertRaises(_ServiceUnavailable):
+                dispatcher.recognize(b"audio")
+            health = dispatcher.health.get('Google')
+            self.assertEqual(engine.calls, 3)
+            self.assertEqual(health.failures, 1)
+            self.assertEqual(health.state, health.CLOSED)
+        finally:
+            dispatcher.shutdown()
+
+    def test_breaker_opens_after_threshold_of_failed_requests(self):
+        engine = _FlakyEngine(failures=100)
+        dispatcher = self._dispatcher(engine)
+        try:
+            health = dispatcher.health.get('Google')
+            for _ in range(health.failure_threshold):
+                self.assertEqual(health.state, health.CLOSED)
+                with self.assertRaises(_ServiceUnavailable):
+                    dispatcher.recognize(b"audio")
+            self.assertEqual(health.state, health.OPEN)
+        finally:
+            dispatcher.shutdown()
+
+    def test_success_after_retry_counts_as_success(self):
+        engine = _FlakyEngine(failures=2)
+        dispatcher = self._dispatcher(engine)
+        try:
+            self.assertEqual(dispatcher.recognize(b"audio"), "你好")
+            health = dispatcher.health.get('Google')
+            self.assertEqual((health.requests, health.successes, health.failures), (1, 1, 0))
+        finally:
+            dispatcher.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
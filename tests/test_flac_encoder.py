@@ -0,0 +1,74 @@
+"""
+进程内 FLAC 编码器测试：用外部 flac 程序解码，结果必须与原始 PCM 逐字节一致
+（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests；找不到 flac 程序时跳过）
+"""
+import os
+import subprocess
+import tempfile
+import unittest
+
+import speech_recognition as sr
+
+import flac_encoder
+
+
+def _find_converter():
+    try:
+        path = sr.get_flac_converter()
+    except OSError:
+        return None
+    return path if os.path.isfile(path) and os.access(path, os.X_OK) else None
+
+
+FLAC_CONVERTER = _find_converter()
+
+
+@unittest.skipUnless(flac_encoder.NUMPY_AVAILABLE, "需要 NumPy")
+@unittest.skipUnless(FLAC_CONVERTER, "找不到 flac 程序")
+class FlacRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        import numpy as np
+        self.np = np
+        self.rng = np.random.default_rng(0)
+
+    def _decode(self, flac_data):
+        with tempfile.TemporaryDirectory() as directory:
+            flac_path = os.path.join(directory, "audio.flac")
+            raw_path = os.path.join(directory, "audio.raw")
+            with open(flac_path, "wb") as f:
+                f.write(flac_data)
+            subprocess.run([FLAC_CONVERTER, "-d", "-s", "-f", "--force-raw-format", "--endian=little",
+                            "--sign=signed", "-o", raw_path, flac_path], check=True, capture_output=True)
+            with open(raw_path, "rb") as f:
+                return f.read()
+
+    def _speech_like(self, count):
+        t = self.np.arange(count) / 16000.0
+        signal = 6000 * self.np.sin(2 * self.np.pi * 180 * t) * (self.np.sin(2 * self.np.pi * 3 * t) > 0)
+        return (signal + self.rng.normal(0, 150, count)).astype("<i2").tobytes()
+
+    def assertRoundTrip(self, pcm, sample_width=2):
+        decoded = self._decode(flac_encoder.encode_flac(pcm, 16000, sample_width))
+        self.assertEqual(decoded, pcm)
+
+    def test_block_boundaries(self):
+        for count in (0, 1, 5, flac_encoder.BLOCK_SIZE, flac_encoder.BLOCK_SIZE + 1, 48017):
+            with self.subTest(samples=count):
+                self.assertRoundTrip(self._speech_like(count))
+
+    def test_white_noise(self):
+        self.assertRoundTrip(self.rng.integers(-32768, 32768, 20000).astype("<i2").tobytes())
+
+    def test_full_scale(self):
+        samples = self.np.where(self.np.arange(10000) % 2, 32767, -32768).astype("<i2")
+        self.assertRoundTrip(samples.tobytes())
+
+    def test_24_bit(self):
+        samples = self.rng.normal(0, 100000, 9000).astype("<i4")
+        pcm = b"".join(int(value).to_bytes(3, "little", signed=True) for value in samples)
+        self.assertRoundTrip(pcm, sample_width=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
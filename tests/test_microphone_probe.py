@@ -0,0 +1,63 @@
+"""
+麦克风并行探测测试（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests）
+"""
+import threading
+import time
+import unittest
+
+from microphone_probe import MicrophoneProber
+
+
+class _FakeMicrophone:
+    """打开需要 open_seconds 秒的假设备；hang 为 True 时打开永远不返回"""
+
+    CHUNK = 1024
+
+    def __init__(self, open_seconds=0.0, close_seconds=0.0, hang=False):
+        self.open_seconds = open_seconds
+        self.close_seconds = close_seconds
+        self.hang = hang
+        self.stream = self
+
+    def __enter__(self):
+        if self.hang:
+            threading.Event().wait()
+        time.sleep(self.open_seconds)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        time.sleep(self.close_seconds)
+
+    def read(self, size):
+        return b"\0\0" * size
+
+
+def _devices(count):
+    return [(index, f"Microphone {index}") for index in range(count)]
+
+
+class MicrophoneProberTest(unittest.TestCase):
+
+    def test_many_slow_devices_all_usable_within_timeout(self):
+        prober = MicrophoneProber(
+            timeout=1.0,
+            microphone_factory=lambda index: _FakeMicrophone(open_seconds=0.2, close_seconds=0.5))
+        results = prober.start(_devices(15)).ranked()
+        self.assertEqual(sum(result.ok for result in results), 15)
+
+    def test_hanging_device_does_not_block_others(self):
+        prober = MicrophoneProber(
+            timeout=0.5,
+            microphone_factory=lambda index: _FakeMicrophone(open_seconds=0.05, hang=(index == 0)))
+        start = time.monotonic()
+        first = prober.start(_devices(3)).wait_first()
+        self.assertIsNotNone(first)
+        self.assertNotEqual(first.index, 0)
+        self.assertLess(time.monotonic() - start, 0.4)
+        results = {result.index: result for result in prober.ranked()}
+        self.assertFalse(results[0].ok)
+        self.assertTrue(results[1].ok and results[2].ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+识别流水线测试（在仓库根目录运行 python -m pytest 或 python -m unittest discover tests）
+"""
+import queue
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+
+from cancellation import CancellationToken, Cancelled
+from recognition_pipeline import RecognitionPipeline, SpeculativeRecognizer
+
+
+class _DeliveredQueue(queue.Queue):
+    """put 返回前等待这个片段的结果交付完成，模拟识别线程比 submit 更快的情况"""
+
+    def __init__(self, delivered):
+        super().__init__()
+        self._delivered = delivered
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if item is not None:
+            self._delivered.wait(1.0)
+            self._delivered.clear()
+
+
+class RecognitionPipelineTest(unittest.TestCase):
+
+    def test_pending_never_negative_with_instant_recognize(self):
+        delivered = threading.Event()
+        observed = []
+        results = []
+
+        def on_result(text, context):
+            observed.append(pipeline.pending())
+            results.append(text)
+            delivered.set()
+
+        pipeline = RecognitionPipeline(lambda audio: audio, on_result=on_result, workers=2)
+        pipeline._queue = _DeliveredQueue(delivered)
+        pipeline.start()
+        for index in range(5):
+            self.assertTrue(pipeline.submit("片段%d" % index))
+        pipeline.close()
+
+        self.assertEqual(results, ["片段%d" % index for index in range(5)])
+        self.assertTrue(all(count >= 0 for count in observed), observed)
+        self.assertEqual(pipeline.pending(), 0)
+
+    def test_results_delivered_in_submit_order(self):
+        results = []
+        pipeline = RecognitionPipeline(lambda audio: audio, on_result=lambda text, context: results.append(text),
+                                       workers=4)
+        pipeline.start()
+        for index in range(50):
+            pipeline.submit(index)
+        pipeline.close()
+        self.assertEqual(results, list(range(50)))
+        self.assertEqual(pipeline.pending(), 0)
+
+    def test_submit_after_close_is_rejected(self):
+        results = []
+        pipeline = RecognitionPipeline(lambda audio: audio, on_result=lambda text, context: results.append(text))
+        pipeline.start()
+        pipeline.close()
+        self.assertFalse(pipeline.submit("片段"))
+        self.assertEqual(results, [])
+        self.assertEqual(pipeline.pending(), 0)
+
+
+
+def _blocking_recognize(started):
+    """一直等到被取消的识别函数，模拟迟迟不返回的引擎请求"""
+    def recognize(audio, cancel_token=None):
+        started.set()
+        if cancel_token is None or not cancel_token.wait(5.0):
+            return "超时"
+        raise Cancelled()
+    return recognize
+
+
+class SpeculativeRecognizerTest(unittest.TestCase):
+
+    def _audio(self, data=b"\1\0" * 1600):
+        return sr.AudioData(data, 16000, 2)
+
+    def test_discarded_speculation_is_interrupted(self):
+        started = threading.Event()
+        speculator = SpeculativeRecognizer(_blocking_recognize(started), workers=1)
+        try:
+            speculator.speculate(self._audio())
+            self.assertTrue(started.wait(1.0))
+            future = speculator._speculation[0]
+            speculator.cancel()
+            start = time.monotonic()
+            with self.assertRaises(Cancelled):
+                future.result(timeout=1.0)
+            self.assertLess(time.monotonic() - start, 0.5)
+            self.assertEqual(speculator.stats()['misses'], 1)
+        finally:
+            speculator.shutdown()
+
+    def test_session_cancel_reaches_speculation(self):
+        started = threading.Event()
+        session = CancellationToken()
+        speculator = SpeculativeRecognizer(_blocking_recognize(started), cancel_token=session)
+        try:
+            speculator.speculate(self._audio())
+            self.assertTrue(started.wait(1.0))
+            future = speculator._speculation[0]
+            session.cancel()
+            with self.assertRaises(Cancelled):
+                future.result(timeout=1.0)
+        finally:
+            speculator.shutdown()
+
+    def test_finished_speculations_detach_from_session_token(self):
+        session = CancellationToken()
+        speculator = SpeculativeRecognizer(lambda audio, cancel_token=None: "你好", cancel_token=session)
+        try:
+            for _ in range(3):
+                speculator.speculate(self._audio())
+                future = speculator.commit(self._audio())
+                self.assertEqual(future.result(timeout=1.0), "你好")
+            time.sleep(0.05)
+            self.assertEqual(session._callbacks, [])
+        finally:
+            speculator.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()